@@ -1,6 +1,10 @@
 # Importing dependencies
 import time
 import os, psutil
+from array import array
+from collections import deque
+from puzzleState import packState, unpackState, applyMove, buildMoveTable, INVERSE_MOVES, buildGoalState, isSolvable
+from solutionCache import getSolutionCache
 pid = os.getpid()
 
 
@@ -8,20 +12,30 @@ pid = os.getpid()
 class Node:
     
     # This method executes when Node class is instantiated (a constructor method), takes argument as a state and number of columns (4 for 15 puzzle)
-    def __init__(self, currentState, columns):
+    # a child created by a move passes None as the state together with its packed state, index of 0 and number of tiles
+    def __init__(self, currentState, columns, packedState=None, indexOfZero=None, size=None):
 
         # binding variables to the object
         self.columns = columns
         self.children = []
-        self.state = []
         self.parent = None
         self.moves = ''
-        self.state = currentState
         self.indexOfZero = 0;
-        # find the index of 0 in current state of puzzle
-        self.setZeroIndex()
-        # creating a hashable item from list
-        self.map = ''.join(str(item) for item in self.state)
+        # creating a hashable item from list (state packed into a single integer), the list itself is not kept
+        if(currentState is None):
+            self.map = packedState
+            self.indexOfZero = indexOfZero
+            self.size = size
+        else:
+            self.map = packState(currentState) if(packedState is None) else packedState
+            self.size = len(currentState)
+            # find the index of 0 in current state of puzzle
+            self.setZeroIndex()
+
+    # State of the node as a list of tiles, derived from the packed state only when it is needed
+    @property
+    def state(self):
+        return unpackState(self.map, self.size)
 
     # override the __eq__ method for Node class
     def __eq__(self, nodeToCompare):
@@ -29,63 +43,48 @@ class Node:
 
     # This method finds the index of 0 in current state and sets a variables
     def setZeroIndex(self):
-        for i in range(0, len(self.state)):
-            if(self.state[i] == 0):
+        state = self.state
+        for i in range(0, len(state)):
+            if(state[i] == 0):
                 self.indexOfZero = i
                 break
 
-    # This method is responsible of creating children nodes of current Node
-    def createChildren(self, newState, move):
-        child = Node(newState, self.columns)
+    # This method is responsible of creating children nodes of current Node, the child's state is the current one with 0 moved to newIndexOfZero
+    def createChildren(self, move, newIndexOfZero):
+        # packed state of the child is derived from the packed state of the parent by moving a single tile
+        child = Node(None, self.columns, applyMove(self.map, self.indexOfZero, newIndexOfZero), newIndexOfZero, self.size)
         self.children.append(child)
         child.parent = self
         # update the move of child by appending moves of parent so that path to goal can be traced
         child.moves = child.parent.moves + move
 
-    # This method check if the passed state is exactly same as Node's current state
-    def isSameState(self, stateToCompare):
-        isSame = True
-        for i in range(0, len(self.state)):
-            if(self.state[i] != stateToCompare[i]):
-                isSame = False
-                break
-        return isSame
+    # This method check if the passed packed state is exactly same as Node's current state
+    def isSameState(self, packedStateToCompare):
+        return self.map == packedStateToCompare
 
     # This method moves the position of 0 to left and create child node
     def moveLeft(self):
         if(self.indexOfZero % self.columns > 0):
-            tempState = self.state.copy()
-            tempState[self.indexOfZero], tempState[self.indexOfZero - 1] = tempState[self.indexOfZero - 1], tempState[self.indexOfZero]
-
             # Create children with move L (Left)
-            self.createChildren(tempState, 'L')
+            self.createChildren('L', self.indexOfZero - 1)
 
     # This method moves the position of 0 to right and create child node
     def moveRight(self):
         if(self.indexOfZero % self.columns < self.columns - 1):
-            tempState = self.state.copy()
-            tempState[self.indexOfZero], tempState[self.indexOfZero + 1] = tempState[self.indexOfZero + 1], tempState[self.indexOfZero]
-
             # Create children with move R (Right)
-            self.createChildren(tempState, 'R')
+            self.createChildren('R', self.indexOfZero + 1)
 
     # This method moves the position of 0 to up and create child node
     def moveUp(self):
         if(self.indexOfZero - self.columns >= 0):
-            tempState = self.state.copy()
-            tempState[self.indexOfZero], tempState[self.indexOfZero - self.columns] = tempState[self.indexOfZero - self.columns], tempState[self.indexOfZero]
-            
             # Create children with move U (Up)
-            self.createChildren(tempState, 'U')
+            self.createChildren('U', self.indexOfZero - self.columns)
 
     # This method moves the position of 0 to down and create child node
     def moveDown(self):
-        if(self.indexOfZero + self.columns < len(self.state)):
-            tempState = self.state.copy()
-            tempState[self.indexOfZero], tempState[self.indexOfZero + self.columns] = tempState[self.indexOfZero + self.columns], tempState[self.indexOfZero]
-
+        if(self.indexOfZero + self.columns < self.size):
             # Create children with move D (Down)
-            self.createChildren(tempState, 'D')
+            self.createChildren('D', self.indexOfZero + self.columns)
 
     # This method expands current by performing every possible set of moves and thus creating children of current Node
     def expandState(self):
@@ -97,54 +96,74 @@ class Node:
 
 
 # This function performs Breadth First Search (BFS), returns a list in which first element is the solution or set of moves to reach gaol state from initial state and 2nd argument as number of nodes that have been expanded in the process
-def breadthFirstSearch(rootNode, goalState):
+# 3rd element holds the search statistics (peak size of the frontier and number of duplicate states eliminated)
+# States are marked as seen when they are generated, so no state is ever added to the frontier twice
+# budget (SearchBudget, optional) is charged for every expanded node
+def breadthFirstSearch(rootNode, goalState, budget=None):
     # Moves to reach to goal from initial state
     movesToGoal = ''
 
-    # Frontier (Queue)
-    openList = []
+    # Packed goal state to compare the children with
+    goalStateMap = packState(goalState)
 
-    # Hashset for checking traversed nodes (explored)
+    # Frontier (FIFO Queue)
+    openList = deque()
+
+    # Hashset for checking generated nodes (frontier + explored)
     closedSet = set()
 
     # Counter to keep track of how many nodes have been expanded
     nodesExpanded = 0
 
+    # Search statistics
+    searchStats = {
+        'frontierPeak': 1,
+        'duplicatesEliminated': 0
+    }
+
     # add the root node to the frontier
     openList.append(rootNode)
+    closedSet.add(rootNode.map)
 
     goalFound = False
     
     while(len(openList) > 0 and not(goalFound)):
-        # Making a FIFO queue
-        currentNode = openList[0]
-        openList.pop(0)
-
-        # adding the popped node into explored or closed set
-        closedSet.add(currentNode.map)
+        currentNode = openList.popleft()
 
         # Expand the node
         currentNode.expandState()
         # Incrementing the counter
         nodesExpanded = nodesExpanded + 1
+        if(budget is not None):
+            budget.charge()
 
-        for i in range(0, len(currentNode.children)):
-            currentChild = currentNode.children[i]
-            if(currentChild.isSameState(goalState)):
+        # children are only needed while they are added to the frontier, the node does not keep them alive
+        children = currentNode.children
+        currentNode.children = []
+
+        for i in range(0, len(children)):
+            currentChild = children[i]
+            if(currentChild.isSameState(goalStateMap)):
                 movesToGoal = currentChild.moves
                 goalFound = True
                 break
 
-            # Check for repeated states, check if whether the child node was already traversed before or not
-            if(not(checkNodeInSet(closedSet, currentChild))):
-                openList.append(currentChild)      
+            # Check for repeated states, check if whether the child node was already generated before or not
+            if(checkNodeInSet(closedSet, currentChild)):
+                searchStats['duplicatesEliminated'] += 1
+            else:
+                closedSet.add(currentChild.map)
+                openList.append(currentChild)
+
+        if(len(openList) > searchStats['frontierPeak']):
+            searchStats['frontierPeak'] = len(openList)
         
         # If goal is reached, then do not perform any further search
         if(goalFound):
             break
 
     # Returning the Solution 
-    return [movesToGoal, nodesExpanded]
+    return [movesToGoal, nodesExpanded, searchStats]
 
 
 
@@ -154,22 +173,224 @@ def checkNodeInSet(setToCheck, node):
 
 
 
-# This function takes initial state as its first argument and performs Breadth First Search to search for goal state
-def FifteenPuzzle(intialState):
-    # Goal State
-    goalState = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+# This function performs Breadth First Search without creating Node objects, returns the same [moves, nodes expanded, search statistics] list as breadthFirstSearch
+# Frontier is a deque (O(1) dequeue) of (node index, packed state, index of 0) and for every generated node only its parent index and
+# the move which created it are kept, so the moves are traced back only when the goal is found
+def queueBreadthFirstSearch(initialState, goalState, columns, budget=None):
+    # Moves to reach to goal from initial state
+    movesToGoal = ''
+
+    # possible moves for every position of 0
+    moveTable = buildMoveTable(len(initialState) // columns, columns)
+
+    goalStateMap = packState(goalState)
+    rootMap = packState(initialState)
+
+    # parent index and move code (character code of L, R, U or D) of every generated node, root has no parent
+    parents = array('l', [-1])
+    moveCodes = bytearray(b' ')
+
+    # Hashset of generated states, a state is marked as soon as it is generated
+    closedSet = set()
+    closedSet.add(rootMap)
+
+    # Frontier (Queue)
+    openList = deque()
+    openList.append((0, rootMap, initialState.index(0)))
+
+    # Counter to keep track of how many nodes have been expanded
+    nodesExpanded = 0
+
+    # Search statistics
+    searchStats = {
+        'frontierPeak': 1,
+        'duplicatesEliminated': 0
+    }
+
+    goalFound = rootMap == goalStateMap
+
+    while(len(openList) > 0 and not(goalFound)):
+        [parentIndex, packedState, indexOfZero] = openList.popleft()
+
+        # Incrementing the counter
+        nodesExpanded = nodesExpanded + 1
+        if(budget is not None):
+            budget.charge()
+
+        for move, newIndexOfZero in moveTable[indexOfZero]:
+            childMap = applyMove(packedState, indexOfZero, newIndexOfZero)
+
+            # Check for repeated states
+            if(childMap in closedSet):
+                searchStats['duplicatesEliminated'] += 1
+                continue
+            closedSet.add(childMap)
+
+            childIndex = len(parents)
+            parents.append(parentIndex)
+            moveCodes.append(ord(move))
+
+            if(childMap == goalStateMap):
+                movesToGoal = traceMoves(parents, moveCodes, childIndex)
+                goalFound = True
+                break
+
+            openList.append((childIndex, childMap, newIndexOfZero))
 
-    # Number of columns in the puzzle
-    columns = 4   
+        if(len(openList) > searchStats['frontierPeak']):
+            searchStats['frontierPeak'] = len(openList)
 
-    # create root node from initial state 
-    rootNode = Node(intialState, columns)
+    # Returning the Solution
+    return [movesToGoal, nodesExpanded, searchStats]
+
+
+
+# This function performs bidirectional Breadth First Search, one frontier grows from the initial state and the other one from the goal state
+# Both searches share one hash index (packed state -> direction and node index), when a generated state is already reached by the other
+# search, the two halves of the path meet. Returns the same [moves, nodes expanded, search statistics] list as breadthFirstSearch
+def bidirectionalBreadthFirstSearch(initialState, goalState, columns, budget=None):
+    # Moves to reach to goal from initial state
+    movesToGoal = ''
+
+    # possible moves for every position of 0
+    moveTable = buildMoveTable(len(initialState) // columns, columns)
+
+    # index 0 of the lists below belongs to the forward search (from initial state) and index 1 to the backward search (from goal state)
+    rootMaps = [packState(initialState), packState(goalState)]
+
+    # parent index, move code and depth of every generated node of both searches
+    parents = [array('l', [-1]), array('l', [-1])]
+    moveCodes = [bytearray(b' '), bytearray(b' ')]
+    depths = [bytearray([0]), bytearray([0])]
+
+    # shared hash index of generated states of both searches, packed state -> (direction, node index)
+    reached = {}
+    reached[rootMaps[0]] = (0, 0)
+    reached[rootMaps[1]] = (1, 0)
+
+    # Frontiers (one layer of each search) of (node index, packed state, index of 0)
+    frontiers = [[(0, rootMaps[0], initialState.index(0))], [(0, rootMaps[1], goalState.index(0))]]
+
+    # Counter to keep track of how many nodes have been expanded
+    nodesExpanded = 0
+
+    # Search statistics
+    searchStats = {
+        'frontierPeak': 2,
+        'duplicatesEliminated': 0
+    }
+
+    if(rootMaps[0] == rootMaps[1]):
+        return [movesToGoal, nodesExpanded, searchStats]
+
+    # shortest meeting found so far as (path length, forward node index, backward node index)
+    bestMeeting = None
+
+    while(len(frontiers[0]) > 0 and len(frontiers[1]) > 0 and bestMeeting is None):
+        # expand the whole layer of the smaller frontier
+        direction = 0 if(len(frontiers[0]) <= len(frontiers[1])) else 1
+        otherDirection = 1 - direction
+        nextLayer = []
+
+        for [parentIndex, packedState, indexOfZero] in frontiers[direction]:
+            nodesExpanded = nodesExpanded + 1
+            if(budget is not None):
+                budget.charge()
+
+            for move, newIndexOfZero in moveTable[indexOfZero]:
+                childMap = applyMove(packedState, indexOfZero, newIndexOfZero)
+
+                if(childMap in reached):
+                    [reachedDirection, reachedIndex] = reached[childMap]
+                    if(reachedDirection == direction):
+                        searchStats['duplicatesEliminated'] += 1
+                        continue
+
+                    # both searches met, complete the layer to make sure the shortest meeting is kept
+                    childIndex = len(parents[direction])
+                    parents[direction].append(parentIndex)
+                    moveCodes[direction].append(ord(move))
+                    depths[direction].append(depths[direction][parentIndex] + 1)
+
+                    pathLength = depths[direction][childIndex] + depths[otherDirection][reachedIndex]
+                    if(bestMeeting is None or pathLength < bestMeeting[0]):
+                        bestMeeting = [pathLength, childIndex, reachedIndex] if(direction == 0) else [pathLength, reachedIndex, childIndex]
+                    continue
+
+                childIndex = len(parents[direction])
+                parents[direction].append(parentIndex)
+                moveCodes[direction].append(ord(move))
+                depths[direction].append(depths[direction][parentIndex] + 1)
+                reached[childMap] = (direction, childIndex)
+                nextLayer.append((childIndex, childMap, newIndexOfZero))
+
+        frontiers[direction] = nextLayer
+
+        if(len(frontiers[0]) + len(frontiers[1]) > searchStats['frontierPeak']):
+            searchStats['frontierPeak'] = len(frontiers[0]) + len(frontiers[1])
+
+    if(bestMeeting is not None):
+        [pathLength, forwardIndex, backwardIndex] = bestMeeting
+        # backward half is traced from goal state to the meeting state, so it is reversed and every move is inverted
+        backwardMoves = traceMoves(parents[1], moveCodes[1], backwardIndex)
+        movesToGoal = traceMoves(parents[0], moveCodes[0], forwardIndex) + ''.join(INVERSE_MOVES[move] for move in reversed(backwardMoves))
+
+    # Returning the Solution
+    return [movesToGoal, nodesExpanded, searchStats]
+
+
+
+# This function follows the parent indexes from a node back to the root and returns the moves from root to that node
+def traceMoves(parents, moveCodes, nodeIndex):
+    moves = []
+    while(parents[nodeIndex] != -1):
+        moves.append(chr(moveCodes[nodeIndex]))
+        nodeIndex = parents[nodeIndex]
+    moves.reverse()
+    return ''.join(moves)
+
+
+
+# This function takes initial state as its first argument and performs Breadth First Search to search for goal state
+# searchMode selects the implementation: 'node' (Node objects), 'queue' (deque with parent indexes, see queueBreadthFirstSearch)
+# or 'bidirectional' (see bidirectionalBreadthFirstSearch)
+# columns and goalState describe the board, any N x M board with up to 16 cells (default is the 15 Puzzle), larger boards raise
+# ValueError (see packState)
+# With useCache the optimal moves are read from the solution cache of the board (see solutionCache.py) if the initial state has been
+# solved before, otherwise the solution is stored in the cache
+def FifteenPuzzle(intialState, searchMode='node', columns=4, goalState=None, useCache=False):
+    # Goal State (tiles in order and blank in the last index if not given)
+    if(goalState is None):
+        goalState = buildGoalState(len(intialState))
+
+    # Reject instances which can not reach the goal state before searching (the search would exhaust the whole state space)
+    if(not(isSolvable(intialState, goalState, columns))):
+        print('no solution exists, the instance is not solvable')
+        return
+
+    solutionCache = None
+    if(useCache):
+        solutionCache = getSolutionCache(goalState, columns)
+        cachedMoves = solutionCache.get(intialState)
+        if(cachedMoves is not None):
+            print('Moves (from solution cache): ', cachedMoves)
+            return
 
     # Apply, Breadth First Search and get solution in term of moves from initial state to goal state
-    [solution, nodesExpanded] = breadthFirstSearch(rootNode, goalState)
+    if(searchMode == 'queue'):
+        [solution, nodesExpanded, searchStats] = queueBreadthFirstSearch(intialState, goalState, columns)
+    elif(searchMode == 'bidirectional'):
+        [solution, nodesExpanded, searchStats] = bidirectionalBreadthFirstSearch(intialState, goalState, columns)
+    else:
+        # create root node from initial state 
+        rootNode = Node(intialState, columns)
+        [solution, nodesExpanded, searchStats] = breadthFirstSearch(rootNode, goalState)
 
     # Check if solution exists
     if(len(solution)):
+        # Breadth First Search always finds the shortest solution
+        if(solutionCache is not None):
+            solutionCache.put(intialState, solution)
         print('Moves: ', solution)
     else:
         print('no solution found')
@@ -177,20 +398,26 @@ def FifteenPuzzle(intialState):
     # Print how many nodes have been expanded
     print('Nodes expanded: ', nodesExpanded)
 
+    # Print the peak size of frontier and the number of duplicate states that were never added to it
+    print('Frontier peak size: ', searchStats['frontierPeak'])
+    print('Duplicates eliminated: ', searchStats['duplicatesEliminated'])
+
 
 
-# Start time
-start = time.time()
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    # Start time
+    start = time.time()
 
-# Start the 15 Puzzle with initial state
-FifteenPuzzle([1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15])
+    # Start the 15 Puzzle with initial state
+    FifteenPuzzle([1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15])
 
-# Print time taken by program (end - start)
-print('Time Taken: ', (time.time() - start), ' seconds')
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
 
-# Create a process
-ps = psutil.Process(pid)
-memoryUse = ps.memory_info().vms/1024
+    # Create a process
+    ps = psutil.Process(pid)
+    memoryUse = ps.memory_info().vms/1024
 
-# Print the memory used by program
-print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
+    # Print the memory used by program
+    print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
@@ -1,70 +1,72 @@
 import time
 import os, psutil
+from collections import OrderedDict
+from puzzleState import packState, unpackState, applyMove, buildGoalState, isSolvable, INVERSE_MOVES
+from solutionCache import getSolutionCache
 pid = os.getpid()
 
 # This class represent the node in Iterative Deepening Search for 15 Puzzle Problem
 class Node:
+    # Number of columns in 15 Puzzle are 4
+    columns = 4
+
     # This method executes when Node class is instantiated (a constructor method), takes argument as a state
-    def __init__(self, currentState):
+    # a child created by a move passes None as the state together with its packed state, index of 0 and number of tiles
+    def __init__(self, currentState, packedState=None, indexOfZero=None, size=None):
         # binding variables to the object
         self.children = []
-        self.state = []
         self.parent = None
         self.moves = ''
-        self.state = currentState
-        # Number of columns in 15 Puzzle are 4
-        self.columns = 4
         self.indexOfZero = 0
         self.depth = 0
-        # find the index of 0 in current state of puzzle
-        setZeroIndex(self)
-        # creating a hashable item from list
-        self.map = '|'.join(str(item) for item in self.state)
+        # creating a hashable item from list (state packed into a single integer), the list itself is not kept
+        if(currentState is None):
+            self.map = packedState
+            self.indexOfZero = indexOfZero
+            self.size = size
+        else:
+            self.map = packState(currentState) if(packedState is None) else packedState
+            self.size = len(currentState)
+            # find the index of 0 in current state of puzzle
+            setZeroIndex(self)
+
+    # State of the node as a list of tiles, derived from the packed state only when it is needed
+    @property
+    def state(self):
+        return unpackState(self.map, self.size)
 
 
-# This method check if the a particular node's current state map (hashable) is same as the state string passed in 2nd argument
-def isSameState(node, stateToCompareString):
-    return node.map == stateToCompareString
+# This method check if the a particular node's current state map (hashable) is same as the packed state passed in 2nd argument
+def isSameState(node, stateToCompareMap):
+    return node.map == stateToCompareMap
 
 
 # This method moves the position of 0 to left and create child node from the passed node
 def moveLeft(node):
     if(node.indexOfZero % node.columns > 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - 1] = tempState[node.indexOfZero - 1], tempState[node.indexOfZero]
-
         # Create children with move L (Left)
-        createChildren(node, tempState, 'L')
+        createChildren(node, 'L', node.indexOfZero - 1)
 
 
 # This method moves the position of 0 to right and create child node from the passed node
 def moveRight(node):
     if(node.indexOfZero % node.columns < node.columns - 1):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + 1] = tempState[node.indexOfZero + 1], tempState[node.indexOfZero]
-
         # Create children with move R (Right)
-        createChildren(node, tempState, 'R')
+        createChildren(node, 'R', node.indexOfZero + 1)
 
 
 # This method moves the position of 0 to up and create child node from the passed node
 def moveUp(node):
     if(node.indexOfZero - node.columns >= 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - node.columns] = tempState[node.indexOfZero - node.columns], tempState[node.indexOfZero]
-        
         # Create children with move U (Up)
-        createChildren(node, tempState, 'U')
+        createChildren(node, 'U', node.indexOfZero - node.columns)
 
 
 # This method moves the position of 0 to down and create child node from the passed node
 def moveDown(node):
-    if(node.indexOfZero + node.columns < len(node.state)):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + node.columns] = tempState[node.indexOfZero + node.columns], tempState[node.indexOfZero]
-
+    if(node.indexOfZero + node.columns < node.size):
         # Create children with move D (Down)
-        createChildren(node, tempState, 'D')
+        createChildren(node, 'D', node.indexOfZero + node.columns)
 
 
 # This method expands current by performing every possible set of moves and thus creating children of current Node
@@ -77,15 +79,17 @@ def expandState(node):
 
 # This method finds the index of 0 in a node's state
 def setZeroIndex(node):
-    for i in range(0, len(node.state)):
-        if(node.state[i] == 0):
+    state = node.state
+    for i in range(0, len(state)):
+        if(state[i] == 0):
             node.indexOfZero = i
             break
 
 
-# This method is responsible of creating children nodes of the node passed and assign them the new state
-def createChildren(node, newState, move):
-    child = Node(newState)
+# This method is responsible of creating children nodes of the node passed, the child's state is the parent's with 0 moved to newIndexOfZero
+def createChildren(node, move, newIndexOfZero):
+    # packed state of the child is derived from the packed state of the parent by moving a single tile
+    child = Node(None, applyMove(node.map, node.indexOfZero, newIndexOfZero), newIndexOfZero, node.size)
     node.children.append(child)
     child.parent = node
     # update the move of child by appending moves of parent so that path to goal can be traced
@@ -93,27 +97,47 @@ def createChildren(node, newState, move):
     child.depth = node.depth + 1
 
 
-# This method detect whether there is a cycle in path of a particular node
-def cycleDetected(node):
-    currentNode = node
-    isCycle = False
-    hashSet = set()
-    while(currentNode):
-        if(currentNode.map in hashSet):
-            isCycle = True
-            break
-        hashSet.add(currentNode.map)
-        currentNode = currentNode.parent
-    return isCycle
+# Default maximum number of states stored in the transposition table of Iterative Deepening Search
+TRANSPOSITION_TABLE_SIZE = 1000000
+
+
+# This class represent a bounded transposition table, it stores for every state the largest remaining depth (depth limit minus
+# depth of the node) it has been searched with, a state popped again with the same or a smaller remaining depth can not lead
+# to a goal which was not already found, so its subtree is pruned. Least recently used states are dropped when the table is full
+class TranspositionTable:
+
+    # This method executes when TranspositionTable class is instantiated (a constructor method), takes maximum number of states
+    def __init__(self, maxEntries=TRANSPOSITION_TABLE_SIZE):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+
+    # This method returns True if the state has already been searched with at least "remainingDepth" moves left, otherwise
+    # records that it is going to be searched with "remainingDepth" moves left and returns False
+    def probe(self, packedState, remainingDepth):
+        searchedDepth = self.entries.get(packedState)
+        if(searchedDepth is not None):
+            self.entries.move_to_end(packedState)
+            if(searchedDepth >= remainingDepth):
+                self.hits += 1
+                return True
+        self.entries[packedState] = remainingDepth
+        if(len(self.entries) > self.maxEntries):
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return False
 
 
 # This method performs Depth Limited Search
 # Accepts rootNode as first Argument
 # Accepts goalState as 2nd Argument
 # Accepts depth limit as 3rd Argument
-def depthLimitedSearch(rootNode, goalState, depthLimit):
-    # Creating hashable string out of goal state
-    goalStateMapString = '|'.join(str(item) for item in goalState)
+# Accepts budget (SearchBudget, optional) as 4th Argument, it is charged for every expanded node
+# Accepts transposition table (TranspositionTable, optional) as 5th Argument, states already searched as deep are pruned
+def depthLimitedSearch(rootNode, goalState, depthLimit, budget=None, transpositionTable=None):
+    # Creating hashable (packed) goal state
+    goalStateMap = packState(goalState)
 
     # Frontier is represented as LIFO Priority queue (stack) with the help of python lists
     frontier = []
@@ -127,6 +151,11 @@ def depthLimitedSearch(rootNode, goalState, depthLimit):
     # Count to take care of number of nodes expanded
     nodesExpanded = 0
 
+    # States on the path from root to the node being expanded, pathStates[depth] is the packed state at that depth
+    # and pathSet holds the same states for O(1) cycle detection
+    pathStates = []
+    pathSet = set()
+
     while(len(frontier) != 0):
         # Getting the top most item of the stack (LIFO Priority Queue)
         currentNode = frontier[len(frontier) - 1]
@@ -134,21 +163,43 @@ def depthLimitedSearch(rootNode, goalState, depthLimit):
         frontier.pop()
 
         # check if the node's state is same as Goal (GOAL CHECK)
-        if(isSameState(currentNode, goalStateMapString)):
+        if(isSameState(currentNode, goalStateMap)):
             result = currentNode
             break
         
         # Limiting the depth
         if(currentNode.depth > depthLimit):
             result = "cutOff"
-        # Detect cycle
-        elif(~(cycleDetected(currentNode))):
-            #expand the node
-            expandState(currentNode)
-            nodesExpanded = nodesExpanded + 1
-            # adding children to frontier
-            for child in currentNode.children:
+            continue
+
+        # Pop the states which are not ancestors of this node (searching their subtrees is finished) from the path
+        while(len(pathStates) > currentNode.depth):
+            pathSet.remove(pathStates.pop())
+
+        # Detect cycle, state of the node is already on its path from the root
+        if(currentNode.map in pathSet):
+            continue
+
+        # Prune states whose subtree has already been searched as deep (the cut off it may have hit is already recorded)
+        if(transpositionTable is not None and transpositionTable.probe(currentNode.map, depthLimit - currentNode.depth)):
+            result = "cutOff"
+            continue
+
+        pathStates.append(currentNode.map)
+        pathSet.add(currentNode.map)
+
+        #expand the node
+        expandState(currentNode)
+        nodesExpanded = nodesExpanded + 1
+        if(budget is not None):
+            budget.charge()
+        # adding children to frontier, except the child which undoes the last move (it is the parent of this node)
+        reverseMove = INVERSE_MOVES.get(currentNode.moves[-1:])
+        for child in currentNode.children:
+            if(child.moves[-1] != reverseMove):
                 frontier.append(child)
+        # children are only referenced by the frontier from now on, so they are freed as soon as their subtree is searched
+        currentNode.children = []
 
     # returning the result and number of nodes expanded
     return [result, nodesExpanded]
@@ -157,13 +208,15 @@ def depthLimitedSearch(rootNode, goalState, depthLimit):
 # This method performs Iterative Deepening Search
 # Accepts rootNode as first Argument
 # Accepts goalState as 2nd Argument
-def iterativeDeepeningSearch(rootNode, goalState):
+# Accepts budget (SearchBudget, optional) as 3rd Argument, it is shared by all depth limited searches
+# Accepts transposition table (TranspositionTable, optional) as 4th Argument, it is shared by all depth limited searches
+def iterativeDeepeningSearch(rootNode, goalState, budget=None, transpositionTable=None):
     depthLimit = 0
     # Count for total number of nodes expanded in all cycles of iterative deepening search
     nodesExpanded = 0
     # loop runs till infinity and only breaks in case of success (found goal state) or for failure
     while(True):
-        [result, nodesExpandedInThisTurn] = depthLimitedSearch(rootNode, goalState, depthLimit)
+        [result, nodesExpandedInThisTurn] = depthLimitedSearch(rootNode, goalState, depthLimit, budget, transpositionTable)
         depthLimit = depthLimit + 1;
         
         nodesExpanded = nodesExpanded + nodesExpandedInThisTurn
@@ -178,35 +231,69 @@ def iterativeDeepeningSearch(rootNode, goalState):
 
 
 # This function takes initial state as its first argument and performs Iterative Deepening Search to search for goal state
-def FifteenPuzzle(intialState):
-    # Goal State
-    goalState = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]  
+# searchMode selects the implementation: 'node' (plain depth limited searches) or 'transposition' (depth limited searches
+# sharing a TranspositionTable of transpositionTableSize states)
+# columns and goalState describe the board, any N x M board with up to 16 cells (default is the 15 Puzzle), larger boards raise
+# ValueError (see packState)
+# With useCache the optimal moves are read from the solution cache of the board (see solutionCache.py) if the initial state has been
+# solved before, otherwise the solution is stored in the cache
+def FifteenPuzzle(intialState, searchMode='node', columns=4, goalState=None, transpositionTableSize=TRANSPOSITION_TABLE_SIZE, useCache=False):
+    # Goal State (tiles in order and blank in the last index if not given)
+    if(goalState is None):
+        goalState = buildGoalState(len(intialState))
+
+    # Reject instances which can not reach the goal state before searching (the search would exhaust the whole state space)
+    if(not(isSolvable(intialState, goalState, columns))):
+        print('no solution exists, the instance is not solvable')
+        return
+
+    solutionCache = None
+    if(useCache):
+        solutionCache = getSolutionCache(goalState, columns)
+        cachedMoves = solutionCache.get(intialState)
+        if(cachedMoves is not None):
+            print('Moves (from solution cache): ', cachedMoves)
+            return
+
+    # Set columns of the puzzle
+    Node.columns = columns
 
     # create root node from initial state 
     rootNode = Node(intialState)
 
     # Apply, Iterative Deepening Search and get solution in term of moves from initial state to goal state
-    [result, nodesExpanded] = iterativeDeepeningSearch(rootNode, goalState)
+    transpositionTable = TranspositionTable(transpositionTableSize) if(searchMode == 'transposition') else None
+    [result, nodesExpanded] = iterativeDeepeningSearch(rootNode, goalState, None, transpositionTable)
 
     # Check if solution exists
     if(result):
+        # Iterative Deepening Search always finds the shortest solution
+        if(solutionCache is not None):
+            solutionCache.put(intialState, result.moves)
         print('Moves: ', result.moves)
         print('Nodes Expanded: ', nodesExpanded)
     else:
         print('no solution found')
 
+    # Print how many subtrees were pruned by the transposition table and how many states it had to drop
+    if(transpositionTable is not None):
+        print('Transposition table hits: ', transpositionTable.hits)
+        print('Transposition table evictions: ', transpositionTable.evictions)
+
 
-# Start time
-start = time.time()
-# Create a process
-ps = psutil.Process(pid)
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    # Start time
+    start = time.time()
+    # Create a process
+    ps = psutil.Process(pid)
 
-# Start solving the puzzle with supplying the initial state
-initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
-FifteenPuzzle(initialState)
+    # Start solving the puzzle with supplying the initial state
+    initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
+    FifteenPuzzle(initialState)
 
-# Print time taken by program (end - start)
-print('Time Taken: ', (time.time() - start), ' seconds')
-memoryUse = ps.memory_info().vms/1024 
-# Print the memory used by program
-print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
+    memoryUse = ps.memory_info().vms/1024 
+    # Print the memory used by program
+    print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
@@ -1,74 +1,83 @@
 import time
+import heapq
 import os, psutil
+from puzzleState import packState, unpackState, getTile, applyMove, buildGoalState, isSolvable, INVERSE_MOVES, SearchBudget, BudgetExceeded
+from patternDatabase import patternDatabaseHeuristic
+from tableHeuristics import linearConflictHeuristic, walkingDistanceHeuristic
+from solutionCache import getSolutionCache
 pid = os.getpid()
 
 # This class represent the node in A* Search for 15 Puzzle Problem
 class Node:
     # This method executes when Node class is instantiated (a constructor method), takes its current state and heuristic function as an argument
-    def __init__(self, currentState, heuristic):
+    # a child created by a move passes None as the state together with its packed state, index of 0 and number of tiles
+    # lookup table of the heuristic is passed from parent to children so that their heuristic can be updated incrementally
+    def __init__(self, currentState, heuristic, packedState=None, heuristicTable=None, indexOfZero=None, size=None):
         # binding variables to the object
         self.children = []
-        self.state = []
         self.parent = None
         self.moves = ''
-        self.state = currentState
-        self.indexOfZero = self.state.index(0)
         self.cost = 0
         self.totalCost = 0
+        self.heuristicCost = 0
         # assign which heuristic to calculate the evaluation function
         self.heuristic = heuristic
-        # creating a hashable item from list
-        self.map = '|'.join(str(item) for item in self.state)
+        self.heuristicTable = heuristicTable
+        # creating a hashable item from list (state packed into a single integer), the list itself is not kept
+        if(currentState is None):
+            self.map = packedState
+            self.indexOfZero = indexOfZero
+            self.size = size
+        else:
+            self.map = packState(currentState) if(packedState is None) else packedState
+            self.indexOfZero = currentState.index(0)
+            self.size = len(currentState)
+
+    # State of the node as a list of tiles, derived from the packed state only when it is needed
+    @property
+    def state(self):
+        return unpackState(self.map, self.size)
 
     # Set Total Cost
     def setTotalCost(self):
         # Calculating the evaluation function as totalCost  i.e. f(n) = g(n) + h(n)
-        self.totalCost = self.cost + self.heuristic(self.state, self.goalState, self.columns)
+        self.heuristicCost = self.heuristic(self.state, self.goalState, self.columns)
+        self.totalCost = self.cost + self.heuristicCost
+        if(self.heuristic in heuristicTableBuilders):
+            self.heuristicTable = getHeuristicTable(self.heuristic, self.goalState, self.columns)
 
 
-# This method check if the a particular node's current state map (hashable) is same as the state string passed in 2nd argument
-def isSameState(node, stateToCompareString):
-    return node.map == stateToCompareString
+# This method check if the a particular node's current state map (hashable) is same as the packed state passed in 2nd argument
+def isSameState(node, stateToCompareMap):
+    return node.map == stateToCompareMap
 
 
 # This method moves the position of 0 to left and create child node from the passed node
 def moveLeft(node):
     if(node.indexOfZero % node.columns > 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - 1] = tempState[node.indexOfZero - 1], tempState[node.indexOfZero]
-
         # Create children with move L (Left)
-        createChildren(node, tempState, 'L')
+        createChildren(node, 'L', node.indexOfZero - 1)
 
 
 # This method moves the position of 0 to right and create child node from the passed node
 def moveRight(node):
     if(node.indexOfZero % node.columns < node.columns - 1):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + 1] = tempState[node.indexOfZero + 1], tempState[node.indexOfZero]
-
         # Create children with move R (Right)
-        createChildren(node, tempState, 'R')
+        createChildren(node, 'R', node.indexOfZero + 1)
 
 
 # This method moves the position of 0 to up and create child node from the passed node
 def moveUp(node):
     if(node.indexOfZero - node.columns >= 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - node.columns] = tempState[node.indexOfZero - node.columns], tempState[node.indexOfZero]
-        
         # Create children with move U (Up)
-        createChildren(node, tempState, 'U')
+        createChildren(node, 'U', node.indexOfZero - node.columns)
 
 
 # This method moves the position of 0 to down and create child node from the passed node
 def moveDown(node):
-    if(node.indexOfZero + node.columns < len(node.state)):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + node.columns] = tempState[node.indexOfZero + node.columns], tempState[node.indexOfZero]
-
+    if(node.indexOfZero + node.columns < node.size):
         # Create children with move D (Down)
-        createChildren(node, tempState, 'D')
+        createChildren(node, 'D', node.indexOfZero + node.columns)
 
 
 # This method expands current by performing every possible set of moves and thus creating children of current Node
@@ -79,9 +88,10 @@ def expandState(node):
     moveDown(node)
 
 
-# This method is responsible of creating children nodes of the node passed and assign them the new state
-def createChildren(node, newState, move):
-    child = Node(newState, node.heuristic)
+# This method is responsible of creating children nodes of the node passed, the child's state is the parent's with 0 moved to newIndexOfZero
+def createChildren(node, move, newIndexOfZero):
+    # packed state of the child is derived from the packed state of the parent by moving a single tile
+    child = Node(None, node.heuristic, applyMove(node.map, node.indexOfZero, newIndexOfZero), node.heuristicTable, newIndexOfZero, node.size)
     node.children.append(child)
     child.parent = node
     # update the move of child by appending moves of parent so that path to goal can be traced
@@ -89,93 +99,171 @@ def createChildren(node, newState, move):
     # incrementing the cost of children by 1 (Assumption: each action cost 1 unit of cost)
     child.cost = node.cost + 1
     # calulate the evaluation function to set the Total Cost i.e. f(n) = g(n) + h(n)
-    child.setTotalCost()
+    if(node.heuristicTable is None):
+        child.setTotalCost()
+    else:
+        # only the tile which took place of 0 has moved, so h(n) of child is h(n) of parent updated by the change of that single tile
+        tile = getTile(node.map, newIndexOfZero)
+        child.heuristicCost = node.heuristicCost - node.heuristicTable[tile][newIndexOfZero] + node.heuristicTable[tile][node.indexOfZero]
+        child.totalCost = child.cost + child.heuristicCost
+
+
+# This method returns the index of every tile in the goal state, goalPositions[tile] = index
+def buildGoalPositions(goalState):
+    goalPositions = [0] * len(goalState)
+    for index in range(0, len(goalState)):
+        goalPositions[goalState[index]] = index
+    return goalPositions
+
+
+# This method builds the lookup table of manhattan distance of every tile at every index from its goal position, table[tile][index]
+def buildManhattanDistanceTable(goalState, gameSize):
+    goalPositions = buildGoalPositions(goalState)
+    table = []
+    for tile in range(0, len(goalState)):
+        distances = []
+        for index in range(0, len(goalState)):
+            if(tile == 0):
+                distances.append(0)
+            else:
+                indexInGoal = goalPositions[tile]
+                distances.append(abs(index // gameSize - indexInGoal // gameSize) + abs(index % gameSize - indexInGoal % gameSize))
+        table.append(distances)
+    return table
+
+
+# This method builds the lookup table of misplaced tiles, table[tile][index] is 1 if the tile at that index is misplaced otherwise 0
+def buildMisplacedTilesTable(goalState, gameSize):
+    goalPositions = buildGoalPositions(goalState)
+    table = []
+    for tile in range(0, len(goalState)):
+        table.append([0 if(tile == 0 or index == goalPositions[tile]) else 1 for index in range(0, len(goalState))])
+    return table
+
+
+# Lookup tables of heuristics, built once for every (heuristic, goal state, game size)
+heuristicTables = {}
+
+
+# This method returns the lookup table of a heuristic (see heuristicTableBuilders)
+def getHeuristicTable(heuristic, goalState, gameSize):
+    key = (heuristic, tuple(goalState), gameSize)
+    if(key not in heuristicTables):
+        heuristicTables[key] = heuristicTableBuilders[heuristic](goalState, gameSize)
+    return heuristicTables[key]
 
 
 # This method returns the total of manhattan distance of all tiles to their goal position
 def manhattanDistanceHeuristic(state, goalState, gameSize):
+    table = getHeuristicTable(manhattanDistanceHeuristic, goalState, gameSize)
     totalManhattanDistance = 0
     for index in range(0, len(state)):
-        item = state[index]
-        if(item == 0):
-            continue
-        indexInGoal = goalState.index(item)
-        diffRow = abs(index // gameSize - indexInGoal // gameSize)
-        diffCol = abs(index % gameSize - indexInGoal % gameSize)
-        totalManhattanDistance += diffRow + diffCol
+        totalManhattanDistance += table[state[index]][index]
     return totalManhattanDistance
 
 
 # This method returns the number of misplaced tiles in the puzzle as compared to its goal state
 def misplacedTilesHeuristic(state, goalState, gameSize):
+    table = getHeuristicTable(misplacedTilesHeuristic, goalState, gameSize)
     totalMisplacedTiles = 0
     for index in range(0, len(state)):
-        item = state[index]
-        if(item == 0):
-            continue
-        indexInGoal = goalState.index(item)
-        if(index != indexInGoal):
-            totalMisplacedTiles += 1
+        totalMisplacedTiles += table[state[index]][index]
     return totalMisplacedTiles
 
 
+# Heuristics which are a sum of independent values of every tile, with the method which builds their lookup table
+# when a tile moves, only its own value changes, so children of a node update the heuristic in O(1) instead of recalculating it
+heuristicTableBuilders = {
+    manhattanDistanceHeuristic: buildManhattanDistanceTable,
+    misplacedTilesHeuristic: buildMisplacedTilesTable
+}
+
+
 # Defining Heuristics and storing reference to particular methods
 availableHeuristics = {
     "h1": misplacedTilesHeuristic,
-    "h2": manhattanDistanceHeuristic
+    "h2": manhattanDistanceHeuristic,
+    "h3": patternDatabaseHeuristic,
+    "h4": linearConflictHeuristic,
+    "h5": walkingDistanceHeuristic
 }
 
 
-# This method makes the python list a priority queue, only the node with lowest cost (estimated) to goal is returned from the frontier
-def getPriorityNode(nodeList):
-    lowestCost = nodeList[0].totalCost
-    lowestCostIndex = 0
-    for index in range(0, len(nodeList)):
-        node = nodeList[index]
-        if(node.totalCost < lowestCost):
-            lowestCost = node.totalCost
-            lowestCostIndex = index
-    lowestCostNode = nodeList[lowestCostIndex]
-    # lowest cost node is popped off the frontier
-    nodeList.remove(lowestCostNode)
-    return lowestCostNode
+# This method returns the priority of a node in weighted A* Search, f(n) = g(n) + w * h(n) (the total cost if weight is 1)
+def weightedCost(node, weight):
+    return node.totalCost if(weight == 1) else node.cost + weight * node.heuristicCost
 
 
-# This function checks whether the node's state is part of the hashset "setToCheck"
-def checkNodeInSet(setToCheck, node):
-    return node.map in setToCheck
+# This method adds a node to the frontier (binary heap), nodes are ordered by lowest total cost f(n) and ties are broken in favour of larger cost g(n)
+# (deeper nodes), the counter keeps the order stable for nodes with same f(n) and g(n) and ensures nodes themselves are never compared
+# With a weight other than 1 nodes are ordered by the weighted total cost g(n) + w * h(n) instead (see weightedCost)
+def addToFrontier(frontier, node, counter, weight=1):
+    heapq.heappush(frontier, (weightedCost(node, weight), -node.cost, counter, node))
+
+
+# This method pops the node with lowest cost (estimated) to goal from the frontier
+# Entries of states which have been reached with a lower cost g(n) afterwards are stale and are skipped (lazy deletion)
+def getPriorityNode(frontier, reachedCosts):
+    while(len(frontier) > 0):
+        node = heapq.heappop(frontier)[3]
+        if(node.cost <= reachedCosts[node.map]):
+            return node
+    return None
 
 
 # This method is the implementation of A* Search Algorithm
 # First argument is the rootNode
 # Second argument is the goal state
-def AStarSearch(rootNode, goalState):
+# Third argument (optional) is the budget (SearchBudget) which is charged for every expanded node
+# Fourth argument (optional) is the weight w of the heuristic, f(n) = g(n) + w * h(n). With w > 1 (weighted A* Search) fewer nodes
+# are expanded and the cost of the solution is at most w times the optimal cost (if the heuristic is admissible)
+# Fifth argument (optional) is the solution cache (SolutionCache) of the board. A reached state whose optimal moves are in its memory
+# gives a solution through that state, its cost is an upper bound: nodes with a total cost not lower than the bound are never added to
+# the frontier and the search stops as soon as the lowest total cost in the frontier reaches it
+def AStarSearch(rootNode, goalState, budget=None, weight=1, solutionCache=None):
     rootNode.setTotalCost()
-    goalStateMapString = '|'.join(str(item) for item in goalState)
-    # Frontier a priority queue (represented by a list)
+    goalStateMap = packState(goalState)
+    # Frontier a priority queue (represented by a binary heap)
     frontier = []
 
-    # Hashset for checking reached nodes
-    reached = set()
+    # lowest cost g(n) with which every state has been reached (added to the frontier)
+    # a state is reached again only with a lower cost, which reopens it if the heuristic is not consistent (e.g. pattern databases)
+    reachedCosts = {}
+
+    # counter of nodes added to the frontier (tie breaker of the heap)
+    pushedNodes = 0
 
     #stores number of nodes expanded
     nodesExpanded = 0
 
     # adding root node to the frontier
-    frontier.append(rootNode)
+    addToFrontier(frontier, rootNode, pushedNodes, weight)
+    reachedCosts[rootNode.map] = rootNode.cost
 
     # Initially, the solution (or result) is set to False
     solution = None
 
+    # best solution through a cached state (node and cached moves from its state) and its cost
+    cachedSolution = None
+    upperBound = float('inf')
+    if(solutionCache is not None):
+        cachedMoves = solutionCache.lookup(rootNode.map)
+        if(cachedMoves is not None):
+            cachedSolution = (rootNode, cachedMoves)
+            upperBound = len(cachedMoves)
+
     while(len(frontier) > 0 and solution == None):
         # Functioning of priority queue (also pops out the lowest cost node from frontier)
-        currentNode = getPriorityNode(frontier)
+        currentNode = getPriorityNode(frontier, reachedCosts)
+        if(currentNode is None):
+            break
 
-        # adding that node to reached set
-        reached.add(currentNode.map)
+        # no node in the frontier can lead to a better solution than the one through a cached state
+        if(weightedCost(currentNode, weight) >= upperBound):
+            break
 
         # Check if goal is achieved
-        if(isSameState(currentNode, goalStateMapString)):
+        if(isSameState(currentNode, goalStateMap)):
             solution = currentNode
             break
 
@@ -183,55 +271,397 @@ def AStarSearch(rootNode, goalState):
         expandState(currentNode)
         #incrementing the node expansion counter
         nodesExpanded += 1
+        if(budget is not None):
+            budget.charge()
         
         for i in range(0, len(currentNode.children)):
-            # Check for repeated states, check if whether the child node was already traversed before or not
-            if(not(checkNodeInSet(reached, currentNode.children[i]))):
-                frontier.append(currentNode.children[i])      
+            child = currentNode.children[i]
+            if(solutionCache is not None):
+                cachedMoves = solutionCache.lookup(child.map)
+                if(cachedMoves is not None and child.cost + len(cachedMoves) < upperBound):
+                    cachedSolution = (child, cachedMoves)
+                    upperBound = child.cost + len(cachedMoves)
+                if(child.totalCost >= upperBound):
+                    continue
+            # Check for repeated states, skip the child if its state was already reached with lower or equal cost
+            if(reachedCosts.get(child.map, child.cost + 1) > child.cost):
+                pushedNodes += 1
+                addToFrontier(frontier, child, pushedNodes, weight)
+                reachedCosts[child.map] = child.cost
+
+    if(solution is None and cachedSolution is not None):
+        solution = completeWithCachedMoves(cachedSolution[0], cachedSolution[1], goalState, goalStateMap)
+
+    return [solution, nodesExpanded]
+
+
+# This method returns the goal node reached from a node by its cached optimal moves, the states in between are not created
+def completeWithCachedMoves(node, cachedMoves, goalState, goalStateMap):
+    if(len(cachedMoves) == 0):
+        return node
+    goalNode = Node(list(goalState), node.heuristic, goalStateMap)
+    goalNode.parent = node
+    goalNode.moves = node.moves + cachedMoves
+    goalNode.cost = node.cost + len(cachedMoves)
+    goalNode.totalCost = goalNode.cost
+    return goalNode
+
+
+# Default weight of the heuristic in weighted A* Search
+WEIGHTED_ASTAR_WEIGHT = 2
+
+# Default initial weight of anytime A* Search, and the amount the weight is lowered by after every solution
+ANYTIME_INITIAL_WEIGHT = 3
+ANYTIME_WEIGHT_STEP = 0.5
+
+# Default number of seconds anytime A* Search keeps improving its solution
+ANYTIME_TIME_LIMIT = 10
+
+
+# This method is the implementation of anytime A* Search (Anytime Repairing A*, ARA*), it is a generator
+# It runs weighted A* Search with a high weight to find a first solution quickly, then lowers the weight and repairs the search
+# instead of starting it again: nodes which are reached with a lower cost g(n) after they were expanded in the current pass are kept
+# aside (inconsistent) and only they are added back to the frontier with the open nodes for the next pass. Nodes whose total
+# cost f(n) is not lower than the cost of the best solution can not lead to a better solution and are never added to the frontier
+# First argument is the rootNode
+# Second argument is the goal state
+# Third argument (optional) is the budget (SearchBudget) which is charged for every expanded node, the search stops with
+# BudgetExceeded when it is exhausted (the solutions yielded so far remain valid)
+# Fourth and fifth arguments (optional) are the initial weight and the amount it is lowered by after every pass (never below 1)
+# Yields [solution Node, nodes expanded, bound] every time a better solution is found (and once more when the last solution is proven
+# optimal), the cost of the solution is at most bound times the optimal cost (if the heuristic is admissible)
+def anytimeAStarSearch(rootNode, goalState, budget=None, initialWeight=ANYTIME_INITIAL_WEIGHT, weightStep=ANYTIME_WEIGHT_STEP):
+    rootNode.setTotalCost()
+    goalStateMap = packState(goalState)
+    weight = max(1, initialWeight)
 
+    # Frontier a priority queue (represented by a binary heap) of the open nodes, openNodes[packed state] = open node of that state
+    frontier = []
+    openNodes = {}
+    # states expanded in the current pass, and nodes reached with a lower cost after their state was expanded in the current pass
+    closedStates = set()
+    inconsistentNodes = {}
+
+    # lowest cost g(n) with which every state has been reached
+    reachedCosts = {}
+
+    # counter of nodes added to the frontier (tie breaker of the heap)
+    pushedNodes = 0
+
+    nodesExpanded = 0
+
+    addToFrontier(frontier, rootNode, pushedNodes, weight)
+    openNodes[rootNode.map] = rootNode
+    reachedCosts[rootNode.map] = rootNode.cost
+
+    solution = None
+    solutionCost = float('inf')
+    yieldedCost = float('inf')
+
+    while(True):
+        # expand nodes until no open node can lead to a solution which is better than the best one by the current weight
+        while(len(frontier) > 0):
+            entry = heapq.heappop(frontier)
+            currentNode = entry[3]
+            if(openNodes.get(currentNode.map) is not currentNode):
+                continue
+            if(entry[0] >= solutionCost):
+                heapq.heappush(frontier, entry)
+                break
+            del openNodes[currentNode.map]
+
+            # Check if goal is achieved
+            if(isSameState(currentNode, goalStateMap)):
+                solution = currentNode
+                solutionCost = currentNode.cost
+                continue
+
+            closedStates.add(currentNode.map)
+            expandState(currentNode)
+            nodesExpanded += 1
+            if(budget is not None):
+                budget.charge()
+
+            for child in currentNode.children:
+                # skip the child if its state was already reached with lower or equal cost or it can not lead to a better solution
+                if(reachedCosts.get(child.map, child.cost + 1) <= child.cost or child.totalCost >= solutionCost):
+                    continue
+                reachedCosts[child.map] = child.cost
+                if(child.map in closedStates):
+                    inconsistentNodes[child.map] = child
+                else:
+                    pushedNodes += 1
+                    addToFrontier(frontier, child, pushedNodes, weight)
+                    openNodes[child.map] = child
+            # children are referenced by the frontier, the node itself only needs its parent
+            currentNode.children = []
+
+        if(solution is None):
+            # the goal state can not be reached
+            return
+
+        # the open and inconsistent nodes with lowest total cost bound the optimal cost from below
+        lowestCost = min([node.totalCost for node in openNodes.values()] + [node.totalCost for node in inconsistentNodes.values()] + [solutionCost])
+        bound = min(weight, solutionCost / lowestCost) if(lowestCost > 0) else 1
+        if(solutionCost < yieldedCost or bound <= 1):
+            yieldedCost = solutionCost
+            yield [solution, nodesExpanded, bound]
+        if(bound <= 1):
+            return
+
+        # next pass with lower weight, the inconsistent nodes are open again and the frontier is ordered by the new weight
+        weight = max(1, weight - weightStep)
+        for state, node in inconsistentNodes.items():
+            openNodes[state] = node
+        inconsistentNodes = {}
+        closedStates = set()
+        frontier = []
+        for node in openNodes.values():
+            pushedNodes += 1
+            addToFrontier(frontier, node, pushedNodes, weight)
+
+
+# Default maximum number of nodes kept in memory by memory bounded A* Search
+MEMORY_BOUNDED_NODES = 100000
+
+
+# This method adds a node to a frontier of memory bounded A* Search with total cost "cost", entries are ordered by lowest cost
+# and larger cost g(n) (deepest first) if sign is 1, or by highest cost and lower cost g(n) (shallowest first) if sign is -1
+def addToBoundedFrontier(frontier, node, cost, counter, sign):
+    heapq.heappush(frontier, (sign * cost, -sign * node.cost, counter, node))
+
+
+# This method pops the node with best (sign 1) or worst (sign -1) total cost from a frontier of memory bounded A* Search
+# Entries whose node is no longer in "nodes" or whose cost has changed are stale and are skipped (lazy deletion)
+def popFromBoundedFrontier(frontier, nodes, sign):
+    while(len(frontier) > 0):
+        entry = heapq.heappop(frontier)
+        node = entry[3]
+        if(nodes.get(node) == sign * entry[0]):
+            del nodes[node]
+            return node
+    return None
+
+
+# This method is the implementation of memory bounded A* Search (Simplified Memory-bounded A*, SMA*)
+# The search tree holds at most maxNodes nodes, when it grows larger the leaf with highest total cost f(n) is evicted and its
+# total cost is backed up to its parent, which remembers it for the move leading to that leaf. A node with evicted children is
+# open again with the lowest backed up total cost and only those children are generated again when it is the best open node
+# The tree is searched without duplicate detection (only the move which undoes the last move is skipped), paths longer than
+# the memory allows get an infinite total cost. The solution is optimal if maxNodes is at least the length of the optimal path
+# First argument is the rootNode
+# Second argument is the goal state
+# Third argument is the maximum number of nodes in memory
+# Fourth argument (optional) is the budget (SearchBudget) which is charged for every expanded node
+# Returns [solution Node or None, nodes expanded, search stats (peak number of nodes in memory and number of evicted nodes)]
+def memoryBoundedAStarSearch(rootNode, goalState, maxNodes=MEMORY_BOUNDED_NODES, budget=None):
+    rootNode.setTotalCost()
+    goalStateMap = packState(goalState)
+
+    # open nodes (not expanded yet or with evicted children) with their total cost, and the priority queue of lowest cost
+    openCosts = {}
+    bestFrontier = []
+    # leaves of the tree in memory (the nodes which can be evicted) with their total cost, and the priority queue of highest cost
+    leafCosts = {}
+    worstFrontier = []
+
+    # total costs of evicted children, backedUpCosts[node][move] = total cost of the child reached by move
+    backedUpCosts = {}
+
+    # counter of nodes added to the frontiers (tie breaker of the heaps)
+    pushedNodes = 0
+
+    nodesExpanded = 0
+    nodesInMemory = 1
+    searchStats = {'peakNodes': 1, 'evictions': 0}
+
+    openCosts[rootNode] = rootNode.totalCost
+    leafCosts[rootNode] = rootNode.totalCost
+    addToBoundedFrontier(bestFrontier, rootNode, rootNode.totalCost, pushedNodes, 1)
+    addToBoundedFrontier(worstFrontier, rootNode, rootNode.totalCost, pushedNodes, -1)
+
+    solution = None
+
+    while(True):
+        currentNode = popFromBoundedFrontier(bestFrontier, openCosts, 1)
+        # every remaining path is longer than the memory allows (or the frontier is empty)
+        if(currentNode is None or currentNode.totalCost == float('inf')):
+            break
+
+        # Check if goal is achieved
+        if(isSameState(currentNode, goalStateMap)):
+            solution = currentNode
+            break
+
+        # children of this node would not fit in memory together with its path
+        if(currentNode.cost >= maxNodes - 1):
+            currentNode.totalCost = float('inf')
+            openCosts[currentNode] = leafCosts[currentNode] = currentNode.totalCost
+            pushedNodes += 1
+            addToBoundedFrontier(bestFrontier, currentNode, currentNode.totalCost, pushedNodes, 1)
+            addToBoundedFrontier(worstFrontier, currentNode, currentNode.totalCost, pushedNodes, -1)
+            continue
+
+        # expanding the node, if some of its children were evicted only those are generated again with their backed up total cost
+        childrenInMemory = currentNode.children
+        currentNode.children = []
+        expandState(currentNode)
+        nodesExpanded += 1
+        if(budget is not None):
+            budget.charge()
+
+        forgottenCosts = backedUpCosts.pop(currentNode, None)
+        reverseMove = INVERSE_MOVES.get(currentNode.moves[-1:])
+        newChildren = []
+        for child in currentNode.children:
+            move = child.moves[-1]
+            if(move == reverseMove or (forgottenCosts is not None and move not in forgottenCosts)):
+                continue
+            # total cost of a child is never lower than the total cost of its parent (pathmax)
+            child.totalCost = max(child.totalCost, currentNode.totalCost, 0 if(forgottenCosts is None) else forgottenCosts[move])
+            newChildren.append(child)
+            openCosts[child] = leafCosts[child] = child.totalCost
+            pushedNodes += 1
+            addToBoundedFrontier(bestFrontier, child, child.totalCost, pushedNodes, 1)
+            addToBoundedFrontier(worstFrontier, child, child.totalCost, pushedNodes, -1)
+        currentNode.children = childrenInMemory + newChildren
+        if(len(currentNode.children) > 0):
+            leafCosts.pop(currentNode, None)
+        nodesInMemory += len(newChildren)
+        searchStats['peakNodes'] = max(searchStats['peakNodes'], nodesInMemory)
+
+        # evict the worst leaves until the tree fits in memory again
+        while(nodesInMemory > maxNodes):
+            leaf = popFromBoundedFrontier(worstFrontier, leafCosts, -1)
+            if(leaf is None):
+                break
+            if(leaf.parent is None):
+                # the root is never evicted
+                leafCosts[leaf] = leaf.totalCost
+                pushedNodes += 1
+                addToBoundedFrontier(worstFrontier, leaf, leaf.totalCost, pushedNodes, -1)
+                break
+            parent = leaf.parent
+            parent.children.remove(leaf)
+            openCosts.pop(leaf, None)
+            backedUpCosts.pop(leaf, None)
+            nodesInMemory -= 1
+            searchStats['evictions'] += 1
+
+            # back up the total cost of the leaf to its parent, which is open again with its lowest backed up total cost
+            forgottenCosts = backedUpCosts.setdefault(parent, {})
+            forgottenCosts[leaf.moves[-1]] = leaf.totalCost
+            openCosts[parent] = min(forgottenCosts.values())
+            pushedNodes += 1
+            addToBoundedFrontier(bestFrontier, parent, openCosts[parent], pushedNodes, 1)
+            # parent without children in memory is a leaf again
+            if(len(parent.children) == 0):
+                parent.totalCost = openCosts[parent]
+                leafCosts[parent] = parent.totalCost
+                addToBoundedFrontier(worstFrontier, parent, parent.totalCost, pushedNodes, -1)
+
+        # drop the stale entries when they outnumber the valid ones, so the frontiers stay bounded as well
+        if(len(bestFrontier) + len(worstFrontier) > 4 * (len(openCosts) + len(leafCosts)) + 64):
+            bestFrontier = [entry for entry in bestFrontier if(openCosts.get(entry[3]) == entry[0])]
+            worstFrontier = [entry for entry in worstFrontier if(leafCosts.get(entry[3]) == -entry[0])]
+            heapq.heapify(bestFrontier)
+            heapq.heapify(worstFrontier)
+
+    return [solution, nodesExpanded, searchStats]
+
+
+# This method runs one search of fifteenPuzzle with one heuristic (described by "description" in the output) and prints its result
+# Returns [solution Node or None, nodes expanded]
+def searchWithHeuristic(initialState, goalState, heuristic, description, searchMode, maxNodes, weight, timeLimit, solutionCache):
+    if(searchMode == 'memoryBounded'):
+        [solution, nodesExpanded, searchStats] = memoryBoundedAStarSearch(Node(initialState, heuristic), goalState, maxNodes)
+        print('Peak nodes in memory and evictions (for A* Search with ' + description + ' as a heuristic): ', searchStats['peakNodes'], searchStats['evictions'])
+    elif(searchMode == 'weighted'):
+        [solution, nodesExpanded] = AStarSearch(Node(initialState, heuristic), goalState, None, weight, solutionCache)
+    elif(searchMode == 'anytime'):
+        # keep the best solution found before the deadline
+        solution = None
+        budget = SearchBudget(None, timeLimit)
+        start = time.time()
+        try:
+            for [solution, nodesExpanded, bound] in anytimeAStarSearch(Node(initialState, heuristic), goalState, budget, weight):
+                print('Solution of length', len(solution.moves), 'within', bound, 'times the optimal after', (time.time() - start),
+                    'seconds (for anytime A* Search with ' + description + ' as a heuristic)')
+        except BudgetExceeded:
+            pass
+        nodesExpanded = budget.nodesExpanded
+    else:
+        [solution, nodesExpanded] = AStarSearch(Node(initialState, heuristic), goalState, None, 1, solutionCache)
+        # only solutions of A* Search are stored, they are optimal with the admissible heuristics of this file
+        if(solution and solutionCache is not None):
+            solutionCache.put(initialState, solution.moves)
+
+    if(solution):
+        print('Moves to reach result (for A* Search with ' + description + ' as a heuristic): ', solution.moves)
+    else:
+        print('no solution found for A* Search with ' + description + ' as a heuristic')
+
+    # Print how many nodes have been expanded
+    print('Nodes expanded (for A* Search with ' + description + ' as a heuristic): ', nodesExpanded)
     return [solution, nodesExpanded]
 
 
 # Methods used to execute the A* Search for 15 Puzzle Problem
 # Takes initial state (problem) as first argument
-def fifteenPuzzle(initialState):
-    # Set columns for 15 puzzle
-    Node.columns = 4
-    goalState = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]  
+# searchMode selects the implementation: 'node' (A* Search), 'memoryBounded' (memoryBoundedAStarSearch keeping at most maxNodes nodes),
+# 'weighted' (weighted A* Search with f(n) = g(n) + weight * h(n)) or 'anytime' (anytimeAStarSearch starting with weight and
+# improving its solution for timeLimit seconds)
+# columns and goalState describe the board, any N x M board with up to 16 cells (default is the 15 Puzzle), larger boards raise
+# ValueError (see packState)
+# With useCache the optimal moves are read from the solution cache of the board (see solutionCache.py) if the initial state has been
+# solved before, otherwise A* Search uses the cached states it reaches as upper bounds and stores its solution in the cache
+def fifteenPuzzle(initialState, searchMode='node', columns=4, goalState=None, maxNodes=MEMORY_BOUNDED_NODES, weight=None, timeLimit=ANYTIME_TIME_LIMIT,
+        useCache=False):
+    # Goal State (tiles in order and blank in the last index if not given)
+    if(goalState is None):
+        goalState = buildGoalState(len(initialState))
+
+    # Default weight of the selected search
+    if(weight is None):
+        weight = ANYTIME_INITIAL_WEIGHT if(searchMode == 'anytime') else WEIGHTED_ASTAR_WEIGHT
+
+    # Reject instances which can not reach the goal state before searching (the search would exhaust the whole state space)
+    if(not(isSolvable(initialState, goalState, columns))):
+        print('no solution exists, the instance is not solvable')
+        return
+
+    solutionCache = None
+    if(useCache):
+        solutionCache = getSolutionCache(goalState, columns)
+        cachedMoves = solutionCache.get(initialState)
+        if(cachedMoves is not None):
+            print('Moves to reach result (from solution cache): ', cachedMoves)
+            return
+
+    # Set columns of the puzzle
+    Node.columns = columns
     Node.goalState = goalState
 
     # A* Search with Misplaced tiles as a Heuristic
-    [solution1, nodesExpanded1] = AStarSearch(Node(initialState, availableHeuristics["h1"]), goalState)
-    if(solution1):
-        print('Moves to reach result (for A* Search with Misplaced Tiles as a heuristic): ', solution1.moves)
-    else:
-        print('no solution found for A* Search with Misplaced Tiles as a heuristic')
-    
-    # Print how many nodes have been expanded
-    print('Nodes expanded for (A* Search with Misplaced Tiles as a heuristic): ', nodesExpanded1)
+    searchWithHeuristic(initialState, goalState, availableHeuristics["h1"], 'Misplaced Tiles', searchMode, maxNodes, weight, timeLimit, solutionCache)
 
     # A* Search with Manhattan distance as a Heuristic
-    [solution2, nodesExpanded2] = AStarSearch(Node(initialState, availableHeuristics["h2"]), goalState)
-    if(solution2):
-        print('Moves to reach result (for A* Search with Manhattan Distance as a heuristic): ', solution2.moves)
-    else:
-        print('no solution found for A* Search with Manhattan Distance as a heuristic')
-    
-    # Print how many nodes have been expanded
-    print('Nodes expanded (for A* Search with Manhattan Distance as a heuristic): ', nodesExpanded2)
+    searchWithHeuristic(initialState, goalState, availableHeuristics["h2"], 'Manhattan Distance', searchMode, maxNodes, weight, timeLimit, solutionCache)
 
 
-# Start time
-start = time.time()
-# Create a process
-ps = psutil.Process(pid)
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    # Start time
+    start = time.time()
+    # Create a process
+    ps = psutil.Process(pid)
 
-initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
-# start the search for goal
-fifteenPuzzle(initialState)
+    initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
+    # start the search for goal
+    fifteenPuzzle(initialState)
 
-# Print time taken by program (end - start)
-print('Time Taken: ', (time.time() - start), ' seconds')
-memoryUse = ps.memory_info().vms/1024 
-# Print the memory used by program
-print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
+    memoryUse = ps.memory_info().vms/1024 
+    # Print the memory used by program
+    print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
@@ -1,77 +1,85 @@
 import sys
 import time
+import multiprocessing
+import concurrent.futures
 import os, psutil
+from puzzleState import packState, unpackState, getTile, applyMove, buildMoveTable, INVERSE_MOVES, SearchBudget, BudgetExceeded, buildGoalState, isSolvable
+from patternDatabase import patternDatabaseHeuristic
+from tableHeuristics import linearConflictHeuristic, walkingDistanceHeuristic
+from solutionCache import getSolutionCache
 pid = os.getpid()
 
 # This class represent the node in IDA* Search for 15 Puzzle Problem
 class Node:
     # This method executes when Node class is instantiated (a constructor method), takes its current state and heuristic function as an argument
-    def __init__(self, currentState, heuristic):
+    # a child created by a move passes None as the state together with its packed state, index of 0 and number of tiles
+    # lookup table of the heuristic is passed from parent to children so that their heuristic can be updated incrementally
+    def __init__(self, currentState, heuristic, packedState=None, heuristicTable=None, indexOfZero=None, size=None):
         # binding variables to the object
         self.children = []
-        self.state = []
         self.parent = None
         self.moves = ''
-        self.state = currentState
-        self.indexOfZero = self.state.index(0)
         self.cost = 0
         self.totalCost = 0
         self.heuristicCost = 0
         # assign which heuristic to calculate the evaluation function
         self.heuristic = heuristic
-        # creating a hashable item from list
-        self.map = '|'.join(str(item) for item in self.state)
+        self.heuristicTable = heuristicTable
+        # creating a hashable item from list (state packed into a single integer), the list itself is not kept
+        if(currentState is None):
+            self.map = packedState
+            self.indexOfZero = indexOfZero
+            self.size = size
+        else:
+            self.map = packState(currentState) if(packedState is None) else packedState
+            self.indexOfZero = currentState.index(0)
+            self.size = len(currentState)
+
+    # State of the node as a list of tiles, derived from the packed state only when it is needed
+    @property
+    def state(self):
+        return unpackState(self.map, self.size)
 
     # Set Total Cost
     def setTotalCost(self):
-        # Calculating the evaluation function as totalCost  i.e. f(n) = g(n) + h(n)
-        self.totalCost = self.cost + self.heuristic(self.state, self.goalState, self.columns)
+        # Calculating the evaluation function as totalCost  i.e. f(n) = g(n) + h(n), heuristic is evaluated only once
         self.heuristicCost = self.heuristic(self.state, self.goalState, self.columns)
+        self.totalCost = self.cost + self.heuristicCost
+        if(self.heuristic in heuristicTableBuilders):
+            self.heuristicTable = getHeuristicTable(self.heuristic, self.goalState, self.columns)
 
 
-# This method check if the a particular node's current state map (hashable) is same as the state string passed in 2nd argument
-def isSameState(node, stateToCompareString):
-    return node.map == stateToCompareString
+# This method check if the a particular node's current state map (hashable) is same as the packed state passed in 2nd argument
+def isSameState(node, stateToCompareMap):
+    return node.map == stateToCompareMap
 
 
 # This method moves the position of 0 to left and create child node from the passed node
 def moveLeft(node):
     if(node.indexOfZero % node.columns > 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - 1] = tempState[node.indexOfZero - 1], tempState[node.indexOfZero]
-
         # Create children with move L (Left)
-        createChildren(node, tempState, 'L')
+        createChildren(node, 'L', node.indexOfZero - 1)
 
 
 # This method moves the position of 0 to right and create child node from the passed node
 def moveRight(node):
     if(node.indexOfZero % node.columns < node.columns - 1):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + 1] = tempState[node.indexOfZero + 1], tempState[node.indexOfZero]
-
         # Create children with move R (Right)
-        createChildren(node, tempState, 'R')
+        createChildren(node, 'R', node.indexOfZero + 1)
 
 
 # This method moves the position of 0 to up and create child node from the passed node
 def moveUp(node):
     if(node.indexOfZero - node.columns >= 0):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero - node.columns] = tempState[node.indexOfZero - node.columns], tempState[node.indexOfZero]
-        
         # Create children with move U (Up)
-        createChildren(node, tempState, 'U')
+        createChildren(node, 'U', node.indexOfZero - node.columns)
 
 
 # This method moves the position of 0 to down and create child node from the passed node
 def moveDown(node):
-    if(node.indexOfZero + node.columns < len(node.state)):
-        tempState = node.state.copy()
-        tempState[node.indexOfZero], tempState[node.indexOfZero + node.columns] = tempState[node.indexOfZero + node.columns], tempState[node.indexOfZero]
-
+    if(node.indexOfZero + node.columns < node.size):
         # Create children with move D (Down)
-        createChildren(node, tempState, 'D')
+        createChildren(node, 'D', node.indexOfZero + node.columns)
 
 
 # This method expands current by performing every possible set of moves and thus creating children of current Node
@@ -82,9 +90,10 @@ def expandState(node):
     moveDown(node)
 
 
-# This method is responsible of creating children nodes of the node passed and assign them the new state
-def createChildren(node, newState, move):
-    child = Node(newState, node.heuristic)
+# This method is responsible of creating children nodes of the node passed, the child's state is the parent's with 0 moved to newIndexOfZero
+def createChildren(node, move, newIndexOfZero):
+    # packed state of the child is derived from the packed state of the parent by moving a single tile
+    child = Node(None, node.heuristic, applyMove(node.map, node.indexOfZero, newIndexOfZero), node.heuristicTable, newIndexOfZero, node.size)
     node.children.append(child)
     child.parent = node
     # update the move of child by appending moves of parent so that path to goal can be traced
@@ -92,46 +101,111 @@ def createChildren(node, newState, move):
     # incrementing the cost of children by 1 (Assumption: each action cost 1 unit of cost)
     child.cost = node.cost + 1
     # calulate the evaluation function to set the Total Cost i.e. f(n) = g(n) + h(n)
-    child.setTotalCost()
+    if(node.heuristicTable is None):
+        child.setTotalCost()
+    else:
+        # only the tile which took place of 0 has moved, so h(n) of child is h(n) of parent updated by the change of that single tile
+        tile = getTile(node.map, newIndexOfZero)
+        child.heuristicCost = node.heuristicCost - node.heuristicTable[tile][newIndexOfZero] + node.heuristicTable[tile][node.indexOfZero]
+        child.totalCost = child.cost + child.heuristicCost
+
+
+# This method returns the index of every tile in the goal state, goalPositions[tile] = index
+def buildGoalPositions(goalState):
+    goalPositions = [0] * len(goalState)
+    for index in range(0, len(goalState)):
+        goalPositions[goalState[index]] = index
+    return goalPositions
+
+
+# This method builds the lookup table of manhattan distance of every tile at every index from its goal position, table[tile][index]
+def buildManhattanDistanceTable(goalState, gameSize):
+    goalPositions = buildGoalPositions(goalState)
+    table = []
+    for tile in range(0, len(goalState)):
+        distances = []
+        for index in range(0, len(goalState)):
+            if(tile == 0):
+                distances.append(0)
+            else:
+                indexInGoal = goalPositions[tile]
+                distances.append(abs(index // gameSize - indexInGoal // gameSize) + abs(index % gameSize - indexInGoal % gameSize))
+        table.append(distances)
+    return table
+
+
+# This method builds the lookup table of misplaced tiles, table[tile][index] is 1 if the tile at that index is misplaced otherwise 0
+def buildMisplacedTilesTable(goalState, gameSize):
+    goalPositions = buildGoalPositions(goalState)
+    table = []
+    for tile in range(0, len(goalState)):
+        table.append([0 if(tile == 0 or index == goalPositions[tile]) else 1 for index in range(0, len(goalState))])
+    return table
+
+
+# Lookup tables of heuristics, built once for every (heuristic, goal state, game size)
+heuristicTables = {}
+
+
+# This method returns the lookup table of a heuristic (see heuristicTableBuilders)
+def getHeuristicTable(heuristic, goalState, gameSize):
+    key = (heuristic, tuple(goalState), gameSize)
+    if(key not in heuristicTables):
+        heuristicTables[key] = heuristicTableBuilders[heuristic](goalState, gameSize)
+    return heuristicTables[key]
 
 
 # This method returns the total of manhattan distance of all tiles to their goal position
 def manhattanDistanceHeuristic(state, goalState, gameSize):
+    table = getHeuristicTable(manhattanDistanceHeuristic, goalState, gameSize)
     totalManhattanDistance = 0
     for index in range(0, len(state)):
-        item = state[index]
-        if(item == 0):
-            continue
-        indexInGoal = goalState.index(item)
-        diffRow = abs(index // gameSize - indexInGoal // gameSize)
-        diffCol = abs(index % gameSize - indexInGoal % gameSize)
-        totalManhattanDistance += diffRow + diffCol
+        totalManhattanDistance += table[state[index]][index]
     return totalManhattanDistance
 
+
 # This method returns the number of misplaced tiles in the puzzle as compared to its goal state
 def misplacedTilesHeuristic(state, goalState, gameSize):
+    table = getHeuristicTable(misplacedTilesHeuristic, goalState, gameSize)
     totalMisplacedTiles = 0
     for index in range(0, len(state)):
-        item = state[index]
-        if(item == 0):
-            continue
-        indexInGoal = goalState.index(item)
-        if(index != indexInGoal):
-            totalMisplacedTiles += 1
+        totalMisplacedTiles += table[state[index]][index]
     return totalMisplacedTiles
 
 
+# Heuristics which are a sum of independent values of every tile, with the method which builds their lookup table
+# when a tile moves, only its own value changes, so children of a node update the heuristic in O(1) instead of recalculating it
+heuristicTableBuilders = {
+    manhattanDistanceHeuristic: buildManhattanDistanceTable,
+    misplacedTilesHeuristic: buildMisplacedTilesTable
+}
+
+
+# Defining Heuristics and storing reference to particular methods
+availableHeuristics = {
+    "h1": misplacedTilesHeuristic,
+    "h2": manhattanDistanceHeuristic,
+    "h3": patternDatabaseHeuristic,
+    "h4": linearConflictHeuristic,
+    "h5": walkingDistanceHeuristic
+}
+
+
 
 # This method is the implementation of Iterative Deepening A Star Search
 # first argument is the root node
 # second argument is the goal state
-def IDAStar(rootNode, goalState):
+# third argument (optional) is the budget (SearchBudget) which is charged for every expanded node
+def IDAStar(rootNode, goalState, budget=None):
     rootNode.setTotalCost()
-    goalStateMapString = '|'.join(str(item) for item in goalState)
+    goalStateMap = packState(goalState)
 
     # this will hold the path
     frontier = []
 
+    # hashset of states on the path, kept in sync with the path so the cycle check is O(1)
+    pathSet = set()
+
     # holds number of nodes expanded
     nodesExpanded = 0
 
@@ -139,10 +213,11 @@ def IDAStar(rootNode, goalState):
     cutOff = rootNode.heuristicCost
 
     frontier.append(rootNode)
+    pathSet.add(rootNode.map)
 
     # keep doing cost limited search until a goal is found
     while(True):
-        [result, nodesExpandedInThisTurn] = CostLimitedSearch(frontier, rootNode.cost, cutOff, goalStateMapString)
+        [result, nodesExpandedInThisTurn] = CostLimitedSearch(frontier, pathSet, rootNode.cost, cutOff, goalStateMap, budget)
         nodesExpanded += nodesExpandedInThisTurn
         if(result == "FOUND"):
             return [frontier, cutOff, nodesExpanded]
@@ -151,9 +226,10 @@ def IDAStar(rootNode, goalState):
         cutOff = result
 
 # this method performs cost limited search
-def CostLimitedSearch(frontier, cost, cutOff, goalStateMapString):
-    # set goal to false
-    isGoal = False
+# pathSet holds the states of the nodes in frontier (path), a state is added when its node is pushed and removed when it is popped
+# The depth first search uses an explicit stack instead of recursion, so the depth of the search is not bounded by the recursion limit
+# returns "FOUND" (frontier then holds the path to goal) or the minimum total cost which exceeded the cut off, together with number of nodes expanded
+def CostLimitedSearch(frontier, pathSet, cost, cutOff, goalStateMap, budget=None):
     nodesExpanded = 0
 
     # select the last item in frontier
@@ -161,32 +237,67 @@ def CostLimitedSearch(frontier, cost, cutOff, goalStateMapString):
 
     # total cost
     totalCost = cost + currentNode.heuristicCost
-    minimum = 0
 
     # cut off the seach
     if(totalCost > cutOff):
         return [totalCost, nodesExpanded]
     # if goal found then return
-    if(isSameState(currentNode, goalStateMapString)):
-        isGoal = True
+    if(isSameState(currentNode, goalStateMap)):
         return ["FOUND", nodesExpanded]
     # expand node if not already expanded
     if(len(currentNode.children) == 0):
         # not expanded
         expandState(currentNode)
         nodesExpanded += 1
-    
-    # check in all child nodes if node with minimum cost exceeding the cutoff
-    for child in currentNode.children:
-        if(not(checkNodeInPath(child, frontier))):
-            frontier.append(child)
-            [t, nexp] = CostLimitedSearch(frontier, cost + costFunc(currentNode, child), cutOff, goalStateMapString)
-            nodesExpanded += nexp
-            if(t == "FOUND"):
-                return ["FOUND", nodesExpanded]
-            if(t < minimum):
-                minimum = t
-            frontier.pop()
+        if(budget is not None):
+            budget.charge()
+
+    # minimum total cost exceeding the cutoff
+    minimum = sys.maxsize
+
+    # stack of [node, cost of node, index of next child to visit] for the nodes of the path searched by this call
+    stack = [[currentNode, cost, 0]]
+
+    while(len(stack) > 0):
+        entry = stack[len(stack) - 1]
+        [node, nodeCost, childIndex] = entry
+
+        # all children are visited, so backtrack (node where this search started stays in frontier)
+        if(childIndex == len(node.children)):
+            stack.pop()
+            if(len(stack) > 0):
+                frontier.pop()
+                pathSet.remove(node.map)
+            continue
+
+        entry[2] = childIndex + 1
+        child = node.children[childIndex]
+        if(checkNodeInPath(child, pathSet)):
+            continue
+
+        childCost = nodeCost + costFunc(node, child)
+        totalCost = childCost + child.heuristicCost
+
+        # cut off the seach
+        if(totalCost > cutOff):
+            if(totalCost < minimum):
+                minimum = totalCost
+            continue
+
+        frontier.append(child)
+        pathSet.add(child.map)
+
+        # if goal found then return
+        if(isSameState(child, goalStateMap)):
+            return ["FOUND", nodesExpanded]
+
+        # expand node if not already expanded
+        if(len(child.children) == 0):
+            expandState(child)
+            nodesExpanded += 1
+            if(budget is not None):
+                budget.charge()
+        stack.append([child, childCost, 0])
 
     return [minimum, nodesExpanded]
 
@@ -194,28 +305,302 @@ def CostLimitedSearch(frontier, cost, cutOff, goalStateMapString):
 def costFunc(node1, node2):
     return node2.cost - node1.cost
 
-# This method checks Node 
-def checkNodeInPath(node, path):
-    isInPath = False
-    for currentNode in path:
-        if(node.map == currentNode.map):
-            isInPath = True
-            break
-    return isInPath
+# This method checks whether the Node's state is on the path (pathSet is the hashset of states on the path)
+def checkNodeInPath(node, pathSet):
+    return node.map in pathSet
+
+
+# This class represent the single mutable board used by lean IDA* Search (no Node objects are created)
+# Moves are made and unmade in place, h(n) is updated with every move and the moves of current path are kept in a list
+class Board:
+    # This method executes when Board class is instantiated (a constructor method), takes the state, goal state, heuristic function and number of columns
+    def __init__(self, state, goalState, heuristic, columns):
+        self.state = list(state)
+        self.goalState = goalState
+        self.columns = columns
+        self.indexOfZero = self.state.index(0)
+        self.heuristic = heuristic
+        # lookup table for incremental update of heuristic (None if heuristic has to be evaluated on the whole board)
+        self.heuristicTable = getHeuristicTable(heuristic, goalState, columns) if(heuristic in heuristicTableBuilders) else None
+        self.heuristicCost = heuristic(self.state, goalState, columns)
+        # possible moves for every position of 0
+        self.moveTable = buildMoveTable(len(self.state) // columns, columns)
+        # moves of the current path
+        self.moves = []
+        # budget of the search (SearchBudget), charged for every expanded node
+        self.budget = None
+        # solution cache of the board (SolutionCache), the packed state is only kept up to date when it is set (see useSolutionCache)
+        self.solutionCache = None
+        self.map = None
+        self.cachedMoves = None
+
+    # This method makes the board look up every state it reaches in the solution cache
+    def useSolutionCache(self, solutionCache):
+        self.solutionCache = solutionCache
+        self.map = packState(self.state)
+
+    # This method slides the tile at newIndexOfZero into the place of 0 and updates h(n), evaluating the heuristic only once
+    def makeMove(self, move, newIndexOfZero):
+        if(self.map is not None):
+            self.map = applyMove(self.map, self.indexOfZero, newIndexOfZero)
+        tile = self.state[newIndexOfZero]
+        self.state[self.indexOfZero] = tile
+        self.state[newIndexOfZero] = 0
+        if(self.heuristicTable is None):
+            self.heuristicCost = self.heuristic(self.state, self.goalState, self.columns)
+        else:
+            self.heuristicCost += self.heuristicTable[tile][self.indexOfZero] - self.heuristicTable[tile][newIndexOfZero]
+        self.indexOfZero = newIndexOfZero
+        self.moves.append(move)
+
+    # This method undoes the last move, index of 0 and h(n) from before the move are passed so nothing has to be recalculated
+    def unmakeMove(self, previousIndexOfZero, previousHeuristicCost):
+        if(self.map is not None):
+            self.map = applyMove(self.map, self.indexOfZero, previousIndexOfZero)
+        self.state[self.indexOfZero] = self.state[previousIndexOfZero]
+        self.state[previousIndexOfZero] = 0
+        self.indexOfZero = previousIndexOfZero
+        self.heuristicCost = previousHeuristicCost
+        self.moves.pop()
+
+    # This method checks whether the board is in goal state
+    def isGoal(self):
+        return self.heuristicCost == 0 and self.state == self.goalState
+
+
+# This method is the implementation of Iterative Deepening A Star Search on a single mutable board (lean IDA*)
+# Takes the initial state, goal state, heuristic function, number of columns and optionally the budget (SearchBudget) of the search
+# and the solution cache (SolutionCache) of the board, a reached state whose optimal moves are in its memory is not searched any further:
+# the cost through it is exact, so it either completes a solution within the cut off or bounds the next cut off
+# Returns [moves, cutOff, nodesExpanded], moves is "NOT_FOUND" if there is no solution
+def leanIDAStar(initialState, goalState, heuristic, columns, budget=None, solutionCache=None):
+    board = Board(initialState, goalState, heuristic, columns)
+    board.budget = budget
+    if(solutionCache is not None):
+        board.useSolutionCache(solutionCache)
+
+    # holds number of nodes expanded
+    nodesExpanded = 0
+
+    #setting up the threshold
+    cutOff = board.heuristicCost
+
+    # keep doing cost limited search until a goal is found
+    while(True):
+        [result, nodesExpandedInThisTurn] = leanCostLimitedSearch(board, 0, cutOff, None)
+        nodesExpanded += nodesExpandedInThisTurn
+        if(result == "FOUND"):
+            return [''.join(board.moves) + (board.cachedMoves or ''), cutOff, nodesExpanded]
+        if(result == sys.maxsize):
+            return ["NOT_FOUND", cutOff, nodesExpanded]
+        cutOff = result
+
+
+# this method performs cost limited search on the board, the move which undoes the last move is never made
+# returns "FOUND" or the minimum total cost which exceeded the cut off, together with number of nodes expanded
+def leanCostLimitedSearch(board, cost, cutOff, lastMove):
+    nodesExpanded = 0
+
+    # total cost
+    totalCost = cost + board.heuristicCost
+
+    # cut off the seach
+    if(totalCost > cutOff):
+        return [totalCost, nodesExpanded]
+    # if goal found then return
+    if(board.isGoal()):
+        return ["FOUND", nodesExpanded]
+
+    # the optimal cost from a cached state is known, the rest of the solution is taken from the cache
+    if(board.solutionCache is not None):
+        cachedMoves = board.solutionCache.lookup(board.map)
+        if(cachedMoves is not None):
+            if(cost + len(cachedMoves) <= cutOff):
+                board.cachedMoves = cachedMoves
+                return ["FOUND", nodesExpanded]
+            return [cost + len(cachedMoves), nodesExpanded]
+
+    nodesExpanded += 1
+    if(board.budget is not None):
+        board.budget.charge()
+    minimum = sys.maxsize
+    indexOfZero = board.indexOfZero
+    heuristicCost = board.heuristicCost
+    reverseMove = INVERSE_MOVES.get(lastMove)
+
+    for move, newIndexOfZero in board.moveTable[indexOfZero]:
+        if(move == reverseMove):
+            continue
+        board.makeMove(move, newIndexOfZero)
+        [t, nexp] = leanCostLimitedSearch(board, cost + 1, cutOff, move)
+        nodesExpanded += nexp
+        if(t == "FOUND"):
+            return ["FOUND", nodesExpanded]
+        if(t < minimum):
+            minimum = t
+        board.unmakeMove(indexOfZero, heuristicCost)
+
+    return [minimum, nodesExpanded]
+
+
+# This class represent the budget of a worker of parallel IDA* Search, it is exhausted as soon as the cancel event is set
+# (another worker has found the goal), the event is checked once every CLOCK_CHECK_INTERVAL expanded nodes
+class CancellableBudget(SearchBudget):
+
+    # This method executes when CancellableBudget class is instantiated (a constructor method)
+    def __init__(self, cancelEvent):
+        SearchBudget.__init__(self)
+        self.cancelEvent = cancelEvent
+
+    # This method charges the budget for one expanded node and raises BudgetExceeded if the search has been cancelled
+    def charge(self):
+        self.nodesExpanded += 1
+        if(self.nodesExpanded % self.CLOCK_CHECK_INTERVAL == 0 and self.cancelEvent.is_set()):
+            raise BudgetExceeded('search cancelled')
+
+
+# Cancel event shared by the workers of parallel IDA* Search (set in every worker process by initializeWorker)
+workerCancelEvent = None
+
+
+# This method initializes a worker process of parallel IDA* Search
+def initializeWorker(cancelEvent):
+    global workerCancelEvent
+    workerCancelEvent = cancelEvent
+
+
+# This method expands the board up to splitDepth moves (the move which undoes the last move is never made) and collects
+# the boards at splitDepth as subtree roots (state, moves), goals found on the way are collected as solutions
+# returns number of nodes expanded
+def splitSearchTree(board, splitDepth, lastMove, subtrees, solutions):
+    if(board.isGoal()):
+        solutions.append(''.join(board.moves))
+        return 0
+    if(len(board.moves) == splitDepth):
+        subtrees.append((list(board.state), ''.join(board.moves)))
+        return 0
+
+    nodesExpanded = 1
+    indexOfZero = board.indexOfZero
+    heuristicCost = board.heuristicCost
+    reverseMove = INVERSE_MOVES.get(lastMove)
+    for move, newIndexOfZero in board.moveTable[indexOfZero]:
+        if(move == reverseMove):
+            continue
+        board.makeMove(move, newIndexOfZero)
+        nodesExpanded += splitSearchTree(board, splitDepth, move, subtrees, solutions)
+        board.unmakeMove(indexOfZero, heuristicCost)
+    return nodesExpanded
+
+
+# This method performs the cost limited search of one subtree in a worker process of parallel IDA* Search
+# Task is (state of subtree root, moves from initial state to subtree root, cut off, goal state, heuristic, columns)
+# returns ["FOUND", moves, nodes expanded], [minimum total cost exceeding the cut off, None, nodes expanded]
+# or ["CANCELLED", None, nodes expanded] if another worker found the goal
+def searchSubtree(task):
+    [state, moves, cutOff, goalState, heuristic, columns] = task
+    board = Board(state, goalState, heuristic, columns)
+    board.moves = list(moves)
+    board.budget = CancellableBudget(workerCancelEvent)
+    try:
+        [result, nodesExpanded] = leanCostLimitedSearch(board, len(moves), cutOff, moves[len(moves) - 1] if(len(moves) > 0) else None)
+    except BudgetExceeded:
+        return ["CANCELLED", None, board.budget.nodesExpanded]
+    if(result == "FOUND"):
+        return ["FOUND", ''.join(board.moves), nodesExpanded]
+    return [result, None, nodesExpanded]
+
+
+# This method is the implementation of parallel Iterative Deepening A Star Search (root split)
+# The search tree is expanded up to splitDepth moves and the subtrees below are distributed to "workers" processes for every
+# threshold, the next threshold is the minimum total cost exceeding the threshold over all workers and as soon as a worker
+# finds the goal all other workers are cancelled
+# Returns [moves, cutOff, nodesExpanded] like leanIDAStar, moves is "NOT_FOUND" if there is no solution
+def parallelIDAStar(initialState, goalState, heuristic, columns, workers=None, splitDepth=6):
+    board = Board(initialState, goalState, heuristic, columns)
+
+    # subtree roots and solutions shorter than (or as long as) the split depth
+    subtrees = []
+    solutions = []
+    nodesExpanded = splitSearchTree(board, splitDepth, None, subtrees, solutions)
+    if(len(solutions) > 0):
+        shortestSolution = min(solutions, key=len)
+        return [shortestSolution, len(shortestSolution), nodesExpanded]
+
+    #setting up the threshold
+    cutOff = board.heuristicCost
+
+    cancelEvent = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=initializeWorker, initargs=(cancelEvent,)) as executor:
+        # keep doing cost limited search of all subtrees until a goal is found
+        while(True):
+            cancelEvent.clear()
+            futures = [executor.submit(searchSubtree, (state, moves, cutOff, goalState, heuristic, columns)) for [state, moves] in subtrees]
+            minimum = sys.maxsize
+            solution = None
+            for future in concurrent.futures.as_completed(futures):
+                # subtrees cancelled before they were started
+                if(future.cancelled()):
+                    continue
+                [result, moves, nodesExpandedInSubtree] = future.result()
+                nodesExpanded += nodesExpandedInSubtree
+                if(result == "FOUND" and solution is None):
+                    solution = moves
+                    # cancel the workers which are still searching and the subtrees which have not been started
+                    cancelEvent.set()
+                    for otherFuture in futures:
+                        otherFuture.cancel()
+                elif(result != "CANCELLED" and result < minimum):
+                    minimum = result
+            if(solution is not None):
+                return [solution, cutOff, nodesExpanded]
+            if(minimum == sys.maxsize):
+                return ["NOT_FOUND", cutOff, nodesExpanded]
+            cutOff = minimum
 
 
 # Methods used to execute the IDA* Search for 15 Puzzle Problem
 # Takes initial state (problem) as first argument
-def fifteenPuzzle(initialState):
-    # Set columns for 15 puzzle
-    Node.columns = 4
-    goalState = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]  
+# searchMode selects the implementation: 'node' (Node objects), 'lean' (single mutable board, see leanIDAStar)
+# or 'parallel' (lean IDA* with subtrees searched by worker processes, see parallelIDAStar)
+# columns and goalState describe the board, any N x M board (default is the 15 Puzzle). Packed states hold up to 16 cells, larger
+# boards raise ValueError (see packState) unless the lean or parallel search is used without the solution cache, they keep lists
+# With useCache the optimal moves are read from the solution cache of the board (see solutionCache.py) if the initial state has been
+# solved before, otherwise the searches store their solution in the cache (lean IDA* also stops at the cached states it reaches)
+def fifteenPuzzle(initialState, searchMode='node', columns=4, goalState=None, useCache=False):
+    # Goal State (tiles in order and blank in the last index if not given)
+    if(goalState is None):
+        goalState = buildGoalState(len(initialState))
+
+    # Reject instances which can not reach the goal state before searching (the search would exhaust the whole state space)
+    if(not(isSolvable(initialState, goalState, columns))):
+        print('no solution exists, the instance is not solvable')
+        return
+
+    solutionCache = None
+    if(useCache):
+        solutionCache = getSolutionCache(goalState, columns)
+        cachedMoves = solutionCache.get(initialState)
+        if(cachedMoves is not None):
+            print('Moves to reach result (from solution cache): ', cachedMoves)
+            return
+
+    # Set columns of the puzzle
+    Node.columns = columns
     Node.goalState = goalState
 
     # IDA* Search with Manhattan Distance as a Heuristic
-    [path1, pathCost1, nodesExpanded1] = IDAStar(Node(initialState, manhattanDistanceHeuristic), goalState)
-    if(path1 != "NOT_FOUND"):
-        print('Moves to reach result (for IDA* Search with Manhattan Distance as a heuristic): ', path1[len(path1) - 1].moves)
+    if(searchMode == 'lean'):
+        [moves1, pathCost1, nodesExpanded1] = leanIDAStar(initialState, goalState, manhattanDistanceHeuristic, Node.columns, None, solutionCache)
+    elif(searchMode == 'parallel'):
+        [moves1, pathCost1, nodesExpanded1] = parallelIDAStar(initialState, goalState, manhattanDistanceHeuristic, Node.columns)
+    else:
+        [path1, pathCost1, nodesExpanded1] = IDAStar(Node(initialState, manhattanDistanceHeuristic), goalState)
+        moves1 = path1[len(path1) - 1].moves if(path1 != "NOT_FOUND") else path1
+    if(moves1 != "NOT_FOUND"):
+        if(solutionCache is not None):
+            solutionCache.put(initialState, moves1)
+        print('Moves to reach result (for IDA* Search with Manhattan Distance as a heuristic): ', moves1)
     else:
         print('no solution found for IDA* Search with Manhattan Distance as a heuristic')
     
@@ -224,9 +609,15 @@ def fifteenPuzzle(initialState):
 
 
     # IDA* Search with with Misplaced Tiles as a Heuristic
-    [path2, pathCost2, nodesExpanded2] = IDAStar(Node(initialState, misplacedTilesHeuristic), goalState)
-    if(path2 != "NOT_FOUND"):
-        print('Moves to reach result (for IDA* Search with Misplaced Tiles as a heuristic): ', path2[len(path2) - 1].moves)
+    if(searchMode == 'lean'):
+        [moves2, pathCost2, nodesExpanded2] = leanIDAStar(initialState, goalState, misplacedTilesHeuristic, Node.columns, None, solutionCache)
+    elif(searchMode == 'parallel'):
+        [moves2, pathCost2, nodesExpanded2] = parallelIDAStar(initialState, goalState, misplacedTilesHeuristic, Node.columns)
+    else:
+        [path2, pathCost2, nodesExpanded2] = IDAStar(Node(initialState, misplacedTilesHeuristic), goalState)
+        moves2 = path2[len(path2) - 1].moves if(path2 != "NOT_FOUND") else path2
+    if(moves2 != "NOT_FOUND"):
+        print('Moves to reach result (for IDA* Search with Misplaced Tiles as a heuristic): ', moves2)
     else:
         print('no solution found for IDA* Search with Misplaced Tiles as a heuristic')
     
@@ -234,17 +625,19 @@ def fifteenPuzzle(initialState):
     print('Nodes expanded for (IDA* Search with Misplaced Tiles as a heuristic): ', nodesExpanded2)
 
 
-# Start time
-start = time.time()
-# Create a process
-ps = psutil.Process(pid)
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    # Start time
+    start = time.time()
+    # Create a process
+    ps = psutil.Process(pid)
 
-initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
-# start the search for goal
-fifteenPuzzle(initialState)
+    initialState = [1, 0, 2, 4, 5, 7, 3, 8, 9, 6, 11, 12, 13, 10, 14, 15]
+    # start the search for goal
+    fifteenPuzzle(initialState)
 
-# Print time taken by program (end - start)
-print('Time Taken: ', (time.time() - start), ' seconds')
-memoryUse = ps.memory_info().vms/1024 
-# Print the memory used by program`
-print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
+    memoryUse = ps.memory_info().vms/1024 
+    # Print the memory used by program`
+    print('Memory Used: ', memoryUse, ' kB')
\ No newline at end of file
@@ -1,4 +1,7 @@
+import time
+import heapq
 import random
+import numpy as np
 
 # MDP Class definition
 class MDP:
@@ -9,6 +12,13 @@ class MDP:
         self.actions = actions
         self.tModel = tModel
         self.rewardFunc = rewardFunc
+        self.compiled = None
+
+    # This method compiles the MDP into arrays (see CompiledMDP), it is compiled only once and reused by every solver
+    def compile(self):
+        if(self.compiled is None):
+            self.compiled = CompiledMDP(self)
+        return self.compiled
 
 
 # This method build the states list (representation of grid MDP states)
@@ -36,7 +46,17 @@ class TransitionModel:
         self.pLeft = probabilities['pLeft']
         self.pRight = probabilities['pRight']
         self.pBackward = probabilities['pBackward']
+        # walls and terminal states as sets, so checking a state is O(1)
+        self.wallSet = set((wall[0], wall[1]) for wall in walls)
+        self.terminalSet = set((tState['state'][0], tState['state'][1]) for tState in terminalStates)
         self.filteredStates = self.filterCorrectStates()
+        self.compiled = None
+
+    # This method compiles the transition model into arrays (see CompiledTransitionModel), it is compiled only once
+    def compile(self):
+        if(self.compiled is None):
+            self.compiled = CompiledTransitionModel(self)
+        return self.compiled
 
     # This method filters the states and neglects walls and terminals states
     def filterCorrectStates(self):
@@ -46,9 +66,8 @@ class TransitionModel:
                 filteredStates.append(state)
         return filteredStates
 
-    # This method returns the list of next states when any particular action is performed
-    def nextState(self, state, action):
-        nextStates = []
+    # This method returns the actions which are actually performed (forward, left and right) when a particular action is chosen
+    def outcomeActions(self, action):
         actionIndex = self.actions.index(action)
         forwardAction = action
         if(actionIndex == 0):
@@ -60,7 +79,13 @@ class TransitionModel:
         else:
             leftAction = self.actions[actionIndex - 1]
             rightAction = self.actions[actionIndex + 1]
-        
+        return [forwardAction, leftAction, rightAction]
+
+    # This method returns the list of next states when any particular action is performed
+    def nextState(self, state, action):
+        nextStates = []
+        [forwardAction, leftAction, rightAction] = self.outcomeActions(action)
+
         nextStates.append({
             'state': self.newState(state, forwardAction),
             'probability': self.pForward
@@ -107,21 +132,87 @@ class TransitionModel:
     
     # This method return Boolean - whether the state is a wall or not
     def isWall(self, state):
-        isNextStateWall = False
-        for wall in self.walls:
-            if(wall[0] == state[0] and wall[1] == state[1]):
-                isNextStateWall = True
-                break
-        return isNextStateWall
+        return (state[0], state[1]) in self.wallSet
 
     # This method return Boolean - whether the state is a terminal state or not
     def isTerminalState(self, state):
-        isTerminalState = False
-        for tState in self.terminalStates:
-            if(tState['state'][0] == state[0] and tState['state'][1] == state[1]):
-                isTerminalState = True
-                break
-        return isTerminalState
+        return (state[0], state[1]) in self.terminalSet
+
+
+# Array form of a transition model, compiled once and reused by every solver
+# Every action has the same three outcomes (forward, left and right), so the transition model is stored as the index of the next
+# state of every (action, outcome, state) and the probability of every outcome instead of a dense S x A x S' matrix
+# Walls and terminal states keep themselves as next states (their utility is never updated)
+class CompiledTransitionModel:
+
+    # constructor compiles the transition model, the next states of all states are found at once for every direction
+    def __init__(self, tModel):
+        size = len(tModel.states)
+        self.probabilities = np.array([tModel.pForward, tModel.pLeft, tModel.pRight])
+        self.wallMask = np.zeros(size, dtype=bool)
+        for wall in tModel.walls:
+            self.wallMask[getStateIndex(wall, tModel.cols)] = True
+        self.terminalMask = np.zeros(size, dtype=bool)
+        for tState in tModel.terminalStates:
+            self.terminalMask[getStateIndex(tState['state'], tModel.cols)] = True
+        self.updatable = ~(self.wallMask | self.terminalMask)
+        self.updatableIndexes = np.flatnonzero(self.updatable).tolist()
+
+        # index of the state reached in every direction, the state itself if the move is blocked by the border or a wall (see newState)
+        indexes = np.arange(size)
+        rows = indexes // tModel.cols + 1
+        cols = indexes % tModel.cols + 1
+        targets = {}
+        for [action, blocked, offset] in [('N', cols == tModel.cols, 1), ('S', cols == 1, -1), ('E', rows == tModel.rows, tModel.cols), ('W', rows == 1, -tModel.cols)]:
+            target = np.where(blocked, indexes, indexes + offset)
+            targets[action] = np.where(self.wallMask[target], indexes, target)
+
+        self.nextStates = np.empty((len(tModel.actions), len(self.probabilities), size), dtype=np.int64)
+        for actionIndex in range(0, len(tModel.actions)):
+            outcomeActions = tModel.outcomeActions(tModel.actions[actionIndex])
+            for outcome in range(0, len(outcomeActions)):
+                self.nextStates[actionIndex, outcome] = targets.get(outcomeActions[outcome], indexes)
+        self.nextStates[:, :, ~self.updatable] = indexes[~self.updatable]
+        self.successorLists = None
+        self.predecessorLists = None
+
+    # This method returns the next states as nested lists, successorLists[action index][outcome][state index], for the solvers
+    # which loop over states in Python (indexing lists is much faster there than indexing arrays)
+    def getSuccessorLists(self):
+        if(self.successorLists is None):
+            self.successorLists = self.nextStates.tolist()
+        return self.successorLists
+
+    # This method returns, for every state, the list of updatable states which can reach it with any action (without duplicates) and
+    # the list of their weights, the highest probability of reaching the state with one action, as (predecessorLists, weightLists)
+    def getPredecessorLists(self):
+        if(self.predecessorLists is None):
+            size = len(self.updatable)
+            updatableIndexes = np.flatnonzero(self.updatable)
+            keys = []
+            weights = []
+            for actionIndex in range(0, self.nextStates.shape[0]):
+                # probability of reaching every (next state, state) pair with this action
+                actionKeys = (self.nextStates[actionIndex][:, updatableIndexes] * size + updatableIndexes).ravel()
+                actionWeights = np.repeat(self.probabilities, len(updatableIndexes))
+                [uniqueKeys, inverse] = np.unique(actionKeys, return_inverse=True)
+                keys.append(uniqueKeys)
+                weights.append(np.bincount(inverse, weights=actionWeights))
+            keys = np.concatenate(keys)
+            weights = np.concatenate(weights)
+            # highest probability of all actions for every pair, pairs sorted by next state
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            weights = weights[order]
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            keys = keys[starts]
+            weights = np.maximum.reduceat(weights, starts)
+            predecessors = (keys % size).tolist()
+            weights = weights.tolist()
+            bounds = np.concatenate(([0], np.cumsum(np.bincount(keys // size, minlength=size)))).tolist()
+            self.predecessorLists = ([predecessors[bounds[stateIndex]:bounds[stateIndex + 1]] for stateIndex in range(0, size)],
+                [weights[bounds[stateIndex]:bounds[stateIndex + 1]] for stateIndex in range(0, size)])
+        return self.predecessorLists
 
 
 # Class definition for Reward
@@ -165,10 +256,53 @@ class Utility:
         return self.values
 
 
+# This class records the progress of the Value Iteration solvers, a solver calls it once per iteration (sweep) with the residual
+# (largest change of utility in the sweep), the time of the sweep, the number of states updated and the utility values after the sweep
+# Nothing is printed by default, with printing every frequency-th record is printed and with printGrid the utility grid as well
+class ProgressMonitor:
+
+    # constructor of the monitor, rows and cols of the grid are only needed to print it
+    def __init__(self, frequency=1, printing=False, printGrid=False, rows=None, cols=None):
+        self.frequency = frequency
+        self.printing = printing
+        self.printGrid = printGrid
+        self.rows = rows
+        self.cols = cols
+        self.records = []
+
+    # This method records one iteration
+    def __call__(self, residual, sweepTime, statesUpdated, values):
+        record = {
+            'iteration': len(self.records) + 1,
+            'residual': float(residual),
+            'sweepTime': sweepTime,
+            'statesUpdated': statesUpdated
+        }
+        self.records.append(record)
+        if(self.printing and record['iteration'] % self.frequency == 0):
+            print('Iteration', record['iteration'], 'residual', record['residual'], 'sweep time', record['sweepTime'], 'states updated', record['statesUpdated'])
+            if(self.printGrid):
+                printMDP(self.rows, self.cols, list(values))
+                print('\n')
+
+
 # This method performs the Value Iteration step
-def valueIteration(mdp, e, df):
+# mode selects the updates: 'synchronous' (every sweep uses the values of the previous sweep), 'gaussSeidel' (see
+# gaussSeidelValueIteration) or 'prioritized' (see prioritizedSweepingValueIteration)
+# progress (optional, e.g. ProgressMonitor) is called after every sweep with residual, sweep time, states updated and utility values
+def valueIteration(mdp, e, df, mode='synchronous', progress=None):
+    if(mode == 'gaussSeidel'):
+        return gaussSeidelValueIteration(mdp, e, df, progress)
+    if(mode == 'prioritized'):
+        return prioritizedSweepingValueIteration(mdp, e, df, progress)
+
     convergingUtility = {}
 
+    # next states and rewards are taken from the compiled MDP
+    compiledMDP = mdp.compile()
+    successorLists = mdp.tModel.compile().getSuccessorLists()
+    probabilities = compiledMDP.probabilities.tolist()
+
     # set initial values to be 0 for each state
     values = [0 for s in mdp.states]
     utility = Utility(mdp.states, values)
@@ -177,30 +311,30 @@ def valueIteration(mdp, e, df):
         maxChange = 0
         values = [value for value in utility.getAllUtilities()]
         convergingUtility = Utility(mdp.states, values)
+        sweepStart = time.perf_counter()
 
-        printMDP(mdp.tModel.rows, mdp.tModel.cols, utility.getAllUtilities())
-        print('\n')
-        
         # iterate over each state
-        for state in mdp.tModel.filteredStates:
+        for stateIndex in compiledMDP.updatableIndexes:
+            state = mdp.states[stateIndex]
             newValues = []
 
             # perform every possible action
-            for action in mdp.actions:
-                newValues.append(QValue(mdp, state, action, convergingUtility, df))
+            for actionIndex in range(0, len(mdp.actions)):
+                newValues.append(compiledQValue(successorLists, probabilities, compiledMDP.rewardList, values, actionIndex, stateIndex, df))
 
             # find max value
             maxNewValue = max(newValues)
 
-            stateIndex = getStateIndex(state, mdp.tModel.cols)
-
             # update the utility
             utility.setUtilityForState(state, stateIndex, maxNewValue)
             
             # set max change
             if (abs(utility.getUtilityForState(state, stateIndex) - convergingUtility.getUtilityForState(state, stateIndex)) > maxChange):
                 maxChange = abs(utility.getUtilityForState(state, stateIndex) - convergingUtility.getUtilityForState(state, stateIndex))
-        
+
+        if(progress is not None):
+            progress(maxChange, time.perf_counter() - sweepStart, len(compiledMDP.updatableIndexes), utility.getAllUtilities())
+
         # break condition
         if(maxChange < ((e * (1 - df))/df) ):
             break
@@ -209,6 +343,52 @@ def valueIteration(mdp, e, df):
     return convergingUtility
 
 
+# Array form of an MDP used by the solvers, the compiled transition model (see CompiledTransitionModel) with the reward of every state
+class CompiledMDP:
+
+    # constructor compiles the MDP
+    def __init__(self, mdp):
+        compiledModel = mdp.tModel.compile()
+        self.size = len(mdp.states)
+        self.probabilities = compiledModel.probabilities
+        self.nextStates = compiledModel.nextStates
+        self.updatable = compiledModel.updatable
+        self.updatableIndexes = compiledModel.updatableIndexes
+        self.rewardList = [mdp.rewardFunc(state) for state in mdp.states]
+        self.rewards = np.array(self.rewardList, dtype=float)
+
+    # This method returns Q(s, a) of all actions and states as an A x S array, reward is received on entering the next state
+    def QValues(self, values, df):
+        nextValues = self.rewards + df * values
+        return np.tensordot(self.probabilities, nextValues[self.nextStates], axes=([0], [1]))
+
+    # This method performs one Bellman update of all states at once and returns the new values (walls and terminal states stay 0)
+    def bellmanUpdate(self, values, df):
+        return np.where(self.updatable, self.QValues(values, df).max(axis=0), 0.0)
+
+
+# This method performs the Value Iteration step with every sweep done as a single array operation over all states and actions
+# It converges exactly like valueIteration and returns the same utility (values before the last sweep)
+# progress (optional, e.g. ProgressMonitor) is called after every sweep like in valueIteration
+def vectorizedValueIteration(mdp, e, df, compiledMDP=None, progress=None):
+    if(compiledMDP is None):
+        compiledMDP = mdp.compile()
+
+    values = np.zeros(compiledMDP.size)
+    while(True):
+        sweepStart = time.perf_counter()
+        newValues = compiledMDP.bellmanUpdate(values, df)
+        maxChange = np.abs(newValues - values).max()
+        if(progress is not None):
+            progress(maxChange, time.perf_counter() - sweepStart, len(compiledMDP.updatableIndexes), newValues)
+        if(maxChange < ((e * (1 - df))/df) ):
+            break
+        values = newValues
+
+    # returns converged utility
+    return Utility(mdp.states, values.tolist())
+
+
 # This method returns the QValue w.r.t action - equivalent of Q(mdp, S, a , U)
 def QValue(mdp, state, action, utility, df):
     totalUtilityValue = 0
@@ -217,6 +397,130 @@ def QValue(mdp, state, action, utility, df):
     return totalUtilityValue
 
 
+# This method performs Value Iteration with in place (Gauss-Seidel) updates, a state updated in a sweep is already used by the states
+# after it in the same sweep, so no copy of the values is made and fewer sweeps are needed than with synchronous updates
+def gaussSeidelValueIteration(mdp, e, df, progress=None):
+    compiledMDP = mdp.compile()
+    successorLists = mdp.tModel.compile().getSuccessorLists()
+    probabilities = compiledMDP.probabilities.tolist()
+    rewards = compiledMDP.rewardList
+
+    values = [0 for s in mdp.states]
+    while(True):
+        maxChange = 0
+        sweepStart = time.perf_counter()
+        for stateIndex in compiledMDP.updatableIndexes:
+            newValue = bestQValue(successorLists, probabilities, rewards, values, stateIndex, df)
+            if(abs(newValue - values[stateIndex]) > maxChange):
+                maxChange = abs(newValue - values[stateIndex])
+            values[stateIndex] = newValue
+
+        if(progress is not None):
+            progress(maxChange, time.perf_counter() - sweepStart, len(compiledMDP.updatableIndexes), values)
+
+        # break condition
+        if(maxChange < ((e * (1 - df))/df) ):
+            break
+
+    # returns converged utility
+    return Utility(mdp.states, values)
+
+
+# This method performs Value Iteration with prioritized sweeping, instead of sweeping over all states only the state with the highest
+# priority is updated at a time. The priority of a state is an upper bound of its Bellman residual |max Q(s, a) - U(s)|: it is 0 right
+# after the state is updated, and a change of U(s') raises it for every predecessor s by df * P(s' | s, a) * |change| (highest
+# probability of all actions), so only the predecessors of an updated state are touched and no QValue is calculated for them
+# States are kept in a priority queue (binary heap), it stops when no priority is above e * (1 - df) / df, which bounds the error of
+# the utility by e like the break condition of valueIteration
+# progress (optional, e.g. ProgressMonitor) is called after every as many updates as there are updatable states (one sweep's worth)
+# with the largest change of utility in those updates
+def prioritizedSweepingValueIteration(mdp, e, df, progress=None):
+    compiledModel = mdp.tModel.compile()
+    compiledMDP = mdp.compile()
+    successorLists = compiledModel.getSuccessorLists()
+    [predecessorLists, weightLists] = compiledModel.getPredecessorLists()
+    probabilities = compiledMDP.probabilities.tolist()
+    rewards = compiledMDP.rewardList
+    threshold = (e * (1 - df))/df
+
+    values = [0 for s in mdp.states]
+
+    # priority of every state not updated since its residual was last raised, entries of the heap with another priority are stale and
+    # skipped. Every initial residual is kept so later raises add to it, only the ones at or above the threshold are queued
+    priorities = {}
+    queue = []
+    for stateIndex in compiledMDP.updatableIndexes:
+        residual = abs(bestQValue(successorLists, probabilities, rewards, values, stateIndex, df) - values[stateIndex])
+        priorities[stateIndex] = residual
+        if(residual >= threshold):
+            queue.append((-residual, stateIndex))
+    heapq.heapify(queue)
+
+    # updates and largest change of utility since progress was last called
+    sweepSize = len(compiledMDP.updatableIndexes)
+    statesUpdated = 0
+    maxChange = 0
+    sweepStart = time.perf_counter()
+
+    while(len(queue) > 0):
+        [priority, stateIndex] = heapq.heappop(queue)
+        if(priorities.get(stateIndex) != -priority):
+            continue
+        del priorities[stateIndex]
+        newValue = bestQValue(successorLists, probabilities, rewards, values, stateIndex, df)
+        change = abs(newValue - values[stateIndex])
+        values[stateIndex] = newValue
+
+        if(progress is not None):
+            statesUpdated += 1
+            if(change > maxChange):
+                maxChange = change
+            if(statesUpdated == sweepSize):
+                progress(maxChange, time.perf_counter() - sweepStart, statesUpdated, values)
+                statesUpdated = 0
+                maxChange = 0
+                sweepStart = time.perf_counter()
+
+        if(change == 0):
+            continue
+
+        # only the residuals of the states which can reach the updated state have changed
+        predecessors = predecessorLists[stateIndex]
+        weights = weightLists[stateIndex]
+        for position in range(0, len(predecessors)):
+            predecessorIndex = predecessors[position]
+            priority = priorities.get(predecessorIndex, 0) + df * weights[position] * change
+            priorities[predecessorIndex] = priority
+            if(priority >= threshold):
+                heapq.heappush(queue, (-priority, predecessorIndex))
+
+    if(progress is not None and statesUpdated > 0):
+        progress(maxChange, time.perf_counter() - sweepStart, statesUpdated, values)
+
+    # returns converged utility
+    return Utility(mdp.states, values)
+
+
+# This method returns the highest QValue of all actions from the compiled MDP given the index of state, rewards and values are lists
+def bestQValue(successorLists, probabilities, rewards, values, stateIndex, df):
+    bestValue = None
+    for actionIndex in range(0, len(successorLists)):
+        value = compiledQValue(successorLists, probabilities, rewards, values, actionIndex, stateIndex, df)
+        if(bestValue is None or value > bestValue):
+            bestValue = value
+    return bestValue
+
+
+# This method returns the QValue w.r.t action from the compiled MDP given the index of action and state, rewards and values are lists
+def compiledQValue(successorLists, probabilities, rewards, values, actionIndex, stateIndex, df):
+    totalUtilityValue = 0
+    nextStates = successorLists[actionIndex]
+    for outcome in range(0, len(probabilities)):
+        nextStateIndex = nextStates[outcome][stateIndex]
+        totalUtilityValue += probabilities[outcome] * ( rewards[nextStateIndex] + ( df * values[nextStateIndex] ))
+    return totalUtilityValue
+
+
 # This method returns the QValue given a policy - equivalent of Q(mdp, S, pi , U)
 def QValuePi(mdp, state, policy, utility, df):
     totalUtilityValue = 0
@@ -250,11 +554,15 @@ class Policy:
 
 # This method returns the best action (which returns the highest utility of all actions) if the given policy is executed
 def calculatePolicy(state, actions, tModel, utility, rewardFunc, df):
+    compiledModel = tModel.compile()
+    successorLists = compiledModel.getSuccessorLists()
+    stateIndex = getStateIndex(state, tModel.cols)
     policyValues = []
-    for action in actions:
+    for actionIndex in range(0, len(actions)):
         totalPolicyValue = 0
-        for nextState in tModel.nextState(state, action):
-            totalPolicyValue += nextState['probability'] * ( rewardFunc(nextState['state']) + (df * utility.getUtilityForState(nextState['state'], getStateIndex(nextState['state'], tModel.cols)) ))
+        for outcome in range(0, len(compiledModel.probabilities)):
+            nextStateIndex = successorLists[actionIndex][outcome][stateIndex]
+            totalPolicyValue += compiledModel.probabilities[outcome] * ( rewardFunc(tModel.states[nextStateIndex]) + (df * utility.getUtilityForState(tModel.states[nextStateIndex], nextStateIndex) ))
         policyValues.append(totalPolicyValue)
     maxValue = max(policyValues)
     
@@ -262,18 +570,94 @@ def calculatePolicy(state, actions, tModel, utility, rewardFunc, df):
 
     return actions[maxValueIndex]
 
+# Default number of Bellman updates of policy evaluation in Modified Policy Iteration
+POLICY_EVALUATION_STEPS = 20
+
+# Default tolerance of the adaptive and iterative policy evaluation (largest change of utility, or residual of the linear system)
+POLICY_EVALUATION_TOLERANCE = 1e-6
+
+
 # This method performs the policy evaluation for Modified Policy Iteration Algorithm and returns an utility
-def policyEvaluation(policy, utility, mdp, df, k):
+# k is the number of Bellman updates, with a tolerance the updates stop as soon as no utility changes by more than the tolerance
+# (adaptive k, k can be None to update until then)
+def policyEvaluation(policy, utility, mdp, df, k, tolerance=None):
+    # next states and rewards are taken from the compiled MDP
+    compiledMDP = mdp.compile()
+    successorLists = mdp.tModel.compile().getSuccessorLists()
+    probabilities = compiledMDP.probabilities.tolist()
+    actionIndexes = {mdp.actions[actionIndex]: actionIndex for actionIndex in range(0, len(mdp.actions))}
+    values = utility.getAllUtilities()
+
     # Modified Policy Iteration because instead of evaluating Policy once, it is iterated for k times with Bellman update
-    for i in range(k):
-        for state in mdp.tModel.filteredStates:
-            stateIndex = getStateIndex(state, mdp.tModel.cols)
-            utility.setUtilityForState(state, stateIndex, QValuePi(mdp, state, policy, utility, df))
+    i = 0
+    while(k is None or i < k):
+        maxChange = 0
+        for stateIndex in compiledMDP.updatableIndexes:
+            state = mdp.states[stateIndex]
+            actionIndex = actionIndexes[policy.getPolicyForState(state, stateIndex)]
+            newValue = compiledQValue(successorLists, probabilities, compiledMDP.rewardList, values, actionIndex, stateIndex, df)
+            if(abs(newValue - values[stateIndex]) > maxChange):
+                maxChange = abs(newValue - values[stateIndex])
+            utility.setUtilityForState(state, stateIndex, newValue)
+        i += 1
+        if(tolerance is not None and maxChange < tolerance):
+            break
     return utility
 
 
+# This method builds the linear system (I - df * P_pi) U = R_pi of a policy over the updatable states (utility of walls and terminal
+# states is 0), P_pi is a sparse (CSR) matrix of transition probabilities and R_pi the expected reward of every state
+# Returns [matrix I - df * P_pi, vector R_pi, indexes of the updatable states]
+# SciPy is imported here and not at the top, so value iteration and the other policy evaluations work without it
+def buildPolicySystem(policy, mdp, df):
+    import scipy.sparse
+    compiledMDP = mdp.compile()
+    actionIndexes = {mdp.actions[actionIndex]: actionIndex for actionIndex in range(0, len(mdp.actions))}
+    updatableIndexes = np.array(compiledMDP.updatableIndexes, dtype=np.int64)
+    policyActions = np.array([actionIndexes[policy.policyList[stateIndex]] for stateIndex in compiledMDP.updatableIndexes], dtype=np.int64)
+    outcomes = np.arange(len(compiledMDP.probabilities))
+
+    # next state of every (updatable state, outcome) with the action of the policy
+    nextStates = compiledMDP.nextStates[policyActions[:, None], outcomes[None, :], updatableIndexes[:, None]]
+    rewards = compiledMDP.rewards[nextStates] @ compiledMDP.probabilities
+
+    # position of every state in the system, -1 if its utility is fixed to 0
+    positions = np.full(compiledMDP.size, -1, dtype=np.int64)
+    positions[updatableIndexes] = np.arange(len(updatableIndexes))
+    columns = positions[nextStates]
+    rows = np.repeat(np.arange(len(updatableIndexes))[:, None], len(outcomes), axis=1)
+    weights = np.broadcast_to(compiledMDP.probabilities, nextStates.shape)
+    inSystem = columns >= 0
+    transitions = scipy.sparse.csr_matrix((weights[inSystem], (rows[inSystem], columns[inSystem])), shape=(len(updatableIndexes), len(updatableIndexes)))
+    return [scipy.sparse.identity(len(updatableIndexes), format='csr') - df * transitions, rewards, updatableIndexes]
+
+
+# This method performs the exact policy evaluation, it solves (I - df * P_pi) U = R_pi and returns the utility of the policy
+# solver is 'direct' (sparse LU factorization) or 'iterative' (BiCGSTAB starting from the current utility, the matrix is not
+# symmetric so conjugate gradient can not be used), which needs less memory on large grids
+def exactPolicyEvaluation(policy, utility, mdp, df, solver='direct', tolerance=POLICY_EVALUATION_TOLERANCE):
+    import scipy.sparse.linalg
+    [matrix, rewards, updatableIndexes] = buildPolicySystem(policy, mdp, df)
+    values = np.array(utility.getAllUtilities(), dtype=float)
+    if(solver == 'iterative'):
+        try:
+            [solution, info] = scipy.sparse.linalg.bicgstab(matrix, rewards, x0=values[updatableIndexes], rtol=tolerance)
+        except TypeError:
+            # SciPy before 1.12 names the relative tolerance tol (rtol is the only name from SciPy 1.14)
+            [solution, info] = scipy.sparse.linalg.bicgstab(matrix, rewards, x0=values[updatableIndexes], tol=tolerance)
+        if(info != 0):
+            # not converged, finish with the direct solver
+            solution = scipy.sparse.linalg.spsolve(matrix.tocsc(), rewards)
+    else:
+        solution = scipy.sparse.linalg.spsolve(matrix.tocsc(), rewards)
+    values[updatableIndexes] = solution
+    return Utility(mdp.states, values.tolist())
+
+
 # This method performs policy Iteration on an MDP given the mdp and discount factor
-def policyIteration(mdp, df):
+# evaluationMode selects the policy evaluation: 'modified' (k Bellman updates, Modified Policy Iteration), 'adaptive' (Bellman updates
+# until no utility changes by more than the tolerance), 'exact' (sparse linear solve) or 'iterative' (iterative linear solve)
+def policyIteration(mdp, df, evaluationMode='modified', k=POLICY_EVALUATION_STEPS, tolerance=POLICY_EVALUATION_TOLERANCE):
     initialPolicyList = setInitialPolicyValues(mdp.tModel)
     for i in range(0, len(initialPolicyList)):
         initialPolicyList[i] = mdp.actions[random.randrange(0, len(mdp.actions))] if(initialPolicyList[i] == '') else initialPolicyList[i]
@@ -285,11 +669,15 @@ def policyIteration(mdp, df):
     values = [0 for s in mdp.states]
     utility = Utility(mdp.states, values)
 
-    # number of value iteration steps to do Bellman Update
-    k = 20
-
     while(True):
-        utility = policyEvaluation(policy, utility, mdp, df, k)
+        if(evaluationMode == 'exact'):
+            utility = exactPolicyEvaluation(policy, utility, mdp, df, 'direct')
+        elif(evaluationMode == 'iterative'):
+            utility = exactPolicyEvaluation(policy, utility, mdp, df, 'iterative', tolerance)
+        elif(evaluationMode == 'adaptive'):
+            utility = policyEvaluation(policy, utility, mdp, df, None, tolerance)
+        else:
+            utility = policyEvaluation(policy, utility, mdp, df, k)
         unchanged = True
 
         for state in mdp.tModel.filteredStates:
@@ -393,9 +781,12 @@ def parseInputFile(fName):
         
 
 # This method is called on program execution and it solves the specified Grid MDP Problem
-def solveMDPProblem():
+# With vectorized the utility is found with vectorizedValueIteration instead of valueIteration, otherwise mode selects the updates of
+# valueIteration ('synchronous', 'gaussSeidel' or 'prioritized'), evaluationMode selects the policy evaluation of policyIteration
+# progress (optional, e.g. ProgressMonitor(printing=True)) is called after every sweep of Value Iteration
+def solveMDPProblem(fName="mdp_input.txt", vectorized=False, mode='synchronous', evaluationMode='modified', progress=None):
     # get parsed data from input file
-    parsedData = parseInputFile("mdp_input.txt")
+    parsedData = parseInputFile(fName)
 
     rows = parsedData['rows']
     cols = parsedData['cols']
@@ -418,7 +809,10 @@ def solveMDPProblem():
     mdp = MDP(states, actions, tModel, Reward.getReward)
 
     # Utility after convergence (Value Iteration)
-    utility = valueIteration(mdp, epsilon, discountFactor)
+    if(vectorized):
+        utility = vectorizedValueIteration(mdp, epsilon, discountFactor, None, progress)
+    else:
+        utility = valueIteration(mdp, epsilon, discountFactor, mode, progress)
 
     initialPolicy = setInitialPolicyValues(tModel)
     
@@ -436,15 +830,16 @@ def solveMDPProblem():
     print("########################### Policy Vector with Value Iteration is: \n")
     printMDP(rows, cols, policy.getAllPolicy())
 
-    policyWithPI = policyIteration(mdp, discountFactor)
+    policyWithPI = policyIteration(mdp, discountFactor, evaluationMode)
 
     # print the policy after modified policy iteration
     print("########################### Policy Vector after Modified Policy Iteration is: \n")
     printMDP(rows, cols, policyWithPI.getAllPolicy())
 
 
-# Execute the solveMDPproblem method
-solveMDPProblem()
+# Execute the solveMDPproblem method only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    solveMDPProblem()
 
 
 
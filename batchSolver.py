@@ -0,0 +1,310 @@
+# Batch solver for the 15 Puzzle Problem
+# Reads many instances from a file (one instance per line, 16 tiles separated by spaces or commas, 0 is the blank),
+# solves them on a pool of worker processes with a node and time budget for every instance and streams the results
+# to a JSONL file (one JSON object per line) in the order the instances are completed
+# Instances which can not reach the goal state are reported as unsolvable without being searched
+# With --cache the optimal solutions are stored in a solution cache and repeated instances are answered from it
+#
+# Usage: python batchSolver.py instances.txt results.jsonl --algorithm idastar --heuristic h2 --time-limit 60
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import importlib.util
+import multiprocessing
+from puzzleState import SearchBudget, BudgetExceeded, isSolvable
+from solutionCache import getSolutionCache
+
+
+# Goal State
+GOAL_STATE = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+
+# Number of columns in the puzzle
+COLUMNS = 4
+
+
+# This method loads a script of this repository as a module, file names like Assignment3-15Puzzle.py are not valid module names
+# so they can not be imported with import statement
+def loadScript(fileName):
+    moduleName = os.path.splitext(fileName)[0].replace('-', '_')
+    if(moduleName not in sys.modules):
+        spec = importlib.util.spec_from_file_location(moduleName, os.path.join(os.path.dirname(os.path.abspath(__file__)), fileName))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[moduleName] = module
+        spec.loader.exec_module(module)
+    return sys.modules[moduleName]
+
+
+# The methods below solve an instance with one of the searches and return [moves or None if there is no solution, nodes expanded]
+# A search can return a dictionary of extra fields of its result as a third item (e.g. bound of anytime A* Search)
+# solutionCache (SolutionCache or None) is used by the searches which can take the cached states they reach as upper bounds
+
+# Breadth First Search (deque and parent indexes, Assignment3-15Puzzle.py)
+def solveWithBreadthFirstSearch(initialState, heuristicName, budget, solutionCache):
+    bfs = loadScript('Assignment3-15Puzzle.py')
+    [moves, nodesExpanded, searchStats] = bfs.queueBreadthFirstSearch(initialState, GOAL_STATE, COLUMNS, budget)
+    return [moves if(len(moves) > 0 or initialState == GOAL_STATE) else None, nodesExpanded]
+
+
+# Bidirectional Breadth First Search (Assignment3-15Puzzle.py)
+def solveWithBidirectionalSearch(initialState, heuristicName, budget, solutionCache):
+    bfs = loadScript('Assignment3-15Puzzle.py')
+    [moves, nodesExpanded, searchStats] = bfs.bidirectionalBreadthFirstSearch(initialState, GOAL_STATE, COLUMNS, budget)
+    return [moves if(len(moves) > 0 or initialState == GOAL_STATE) else None, nodesExpanded]
+
+
+# Iterative Deepening Search (Assignment_4.py)
+def solveWithIterativeDeepeningSearch(initialState, heuristicName, budget, solutionCache):
+    ids = loadScript('Assignment_4.py')
+    [result, nodesExpanded] = ids.iterativeDeepeningSearch(ids.Node(list(initialState)), GOAL_STATE, budget)
+    return [result.moves if(result) else None, nodesExpanded]
+
+
+# A* Search (Assignment_5.py)
+def solveWithAStarSearch(initialState, heuristicName, budget, solutionCache):
+    astar = loadScript('Assignment_5.py')
+    astar.Node.columns = COLUMNS
+    astar.Node.goalState = GOAL_STATE
+    [solution, nodesExpanded] = astar.AStarSearch(astar.Node(list(initialState), astar.availableHeuristics[heuristicName]), GOAL_STATE, budget, 1, solutionCache)
+    return [solution.moves if(solution) else None, nodesExpanded]
+
+
+# Weighted A* Search (Assignment_5.py), the cost of the solution is at most WEIGHTED_ASTAR_WEIGHT times the optimal cost
+def solveWithWeightedAStarSearch(initialState, heuristicName, budget, solutionCache):
+    astar = loadScript('Assignment_5.py')
+    astar.Node.columns = COLUMNS
+    astar.Node.goalState = GOAL_STATE
+    [solution, nodesExpanded] = astar.AStarSearch(astar.Node(list(initialState), astar.availableHeuristics[heuristicName]), GOAL_STATE, budget,
+        astar.WEIGHTED_ASTAR_WEIGHT, solutionCache)
+    return [solution.moves if(solution) else None, nodesExpanded]
+
+
+# Anytime A* Search (Assignment_5.py), returns the best solution found before the budget is exhausted (optimal if it is not)
+# and its bound (the cost of the solution is at most bound times the optimal cost), the status is solved_suboptimal if the
+# budget was exhausted before the bound reached 1
+def solveWithAnytimeAStarSearch(initialState, heuristicName, budget, solutionCache):
+    astar = loadScript('Assignment_5.py')
+    astar.Node.columns = COLUMNS
+    astar.Node.goalState = GOAL_STATE
+    solution = None
+    bound = None
+    try:
+        for [solution, nodesExpanded, bound] in astar.anytimeAStarSearch(astar.Node(list(initialState), astar.availableHeuristics[heuristicName]),
+                GOAL_STATE, budget):
+            pass
+    except BudgetExceeded:
+        if(solution is None):
+            raise
+    searchResult = {'bound': bound}
+    if(bound is not None and bound > 1):
+        searchResult['status'] = 'solved_suboptimal'
+    return [solution.moves if(solution) else None, budget.nodesExpanded, searchResult]
+
+
+# Memory bounded A* Search (Assignment_5.py), the search tree never holds more than MEMORY_BOUNDED_NODES nodes
+# The peak number of nodes in memory and the number of evicted nodes are returned as extra fields of the result
+def solveWithMemoryBoundedAStarSearch(initialState, heuristicName, budget, solutionCache):
+    astar = loadScript('Assignment_5.py')
+    astar.Node.columns = COLUMNS
+    astar.Node.goalState = GOAL_STATE
+    [solution, nodesExpanded, searchStats] = astar.memoryBoundedAStarSearch(astar.Node(list(initialState), astar.availableHeuristics[heuristicName]),
+        GOAL_STATE, astar.MEMORY_BOUNDED_NODES, budget)
+    return [solution.moves if(solution) else None, nodesExpanded, {'peakNodes': searchStats['peakNodes'], 'evictions': searchStats['evictions']}]
+
+
+# IDA* Search (lean IDA* of assignment6.py)
+def solveWithIDAStarSearch(initialState, heuristicName, budget, solutionCache):
+    idastar = loadScript('assignment6.py')
+    [moves, cutOff, nodesExpanded] = idastar.leanIDAStar(initialState, GOAL_STATE, idastar.availableHeuristics[heuristicName], COLUMNS, budget, solutionCache)
+    return [moves if(moves != "NOT_FOUND") else None, nodesExpanded]
+
+
+# Available searches
+availableSolvers = {
+    'bfs': solveWithBreadthFirstSearch,
+    'bidirectional': solveWithBidirectionalSearch,
+    'ids': solveWithIterativeDeepeningSearch,
+    'astar': solveWithAStarSearch,
+    'wastar': solveWithWeightedAStarSearch,
+    'arastar': solveWithAnytimeAStarSearch,
+    'smastar': solveWithMemoryBoundedAStarSearch,
+    'idastar': solveWithIDAStarSearch
+}
+
+# Searches which always find the shortest solution, only their solutions are stored in the solution cache
+optimalSolvers = {'bfs', 'bidirectional', 'ids', 'astar', 'smastar', 'idastar'}
+
+# Script of every search, the availableHeuristics table of the script lists the heuristics the search accepts
+solverScripts = {
+    'bfs': 'Assignment3-15Puzzle.py',
+    'bidirectional': 'Assignment3-15Puzzle.py',
+    'ids': 'Assignment_4.py',
+    'astar': 'Assignment_5.py',
+    'wastar': 'Assignment_5.py',
+    'arastar': 'Assignment_5.py',
+    'smastar': 'Assignment_5.py',
+    'idastar': 'assignment6.py'
+}
+
+
+# This method returns the names of the heuristics a search accepts, or None if the search does not use a heuristic
+def getHeuristicNames(algorithm):
+    script = loadScript(solverScripts[algorithm])
+    if(not(hasattr(script, 'availableHeuristics'))):
+        return None
+    return sorted(script.availableHeuristics.keys())
+
+
+# This method prepares the heuristic of a search by evaluating it once on the goal state, so its tables (pattern database,
+# linear conflict and walking distance tables) are built or loaded from disk before any instance is searched and the time it
+# takes is not charged to the budget of the first instance of every worker
+# It is called in the main process before the pool is started and as the initializer of every worker process
+def prepareHeuristic(algorithm, heuristicName):
+    script = loadScript(solverScripts[algorithm])
+    if(hasattr(script, 'availableHeuristics')):
+        script.availableHeuristics[heuristicName](GOAL_STATE, GOAL_STATE, COLUMNS)
+
+
+# This method parses one line of the input file into a state, raises ValueError if the line is not a valid instance
+def parseInstance(line):
+    state = [int(item) for item in line.replace(',', ' ').split()]
+    if(sorted(state) != list(range(0, len(GOAL_STATE)))):
+        raise ValueError('instance must contain every tile from 0 to ' + str(len(GOAL_STATE) - 1) + ' exactly once')
+    return state
+
+
+# This method solves one instance in a worker process and returns its result
+# Task is (line number, line of input file, search, heuristic, node limit, time limit, path of the solution cache or None)
+# peakMemoryKB is the peak resident memory of the worker process so far (instance exact with fresh workers, see runBatch)
+# Instances found in the solution cache are reported as solved without being searched ("cached" is True)
+# Any other error of an instance is reported with status "error" and its message, so the rest of the batch is still solved
+def solveInstance(task):
+    [lineNumber, line, algorithm, heuristicName, nodeLimit, timeLimit, cachePath] = task
+    result = {
+        'line': lineNumber,
+        'instance': line.strip(),
+        'algorithm': algorithm,
+        'heuristic': heuristicName
+    }
+
+    try:
+        initialState = parseInstance(line)
+    except ValueError as error:
+        result['status'] = 'invalid'
+        result['error'] = str(error)
+        return result
+
+    # unsolvable instances are rejected at once instead of exhausting the budget
+    if(not(isSolvable(initialState, GOAL_STATE, COLUMNS))):
+        result['status'] = 'unsolvable'
+        result['moves'] = None
+        result['length'] = None
+        result['nodesExpanded'] = 0
+        return result
+
+    start = time.time()
+    budget = SearchBudget(nodeLimit, timeLimit)
+    moves = None
+    try:
+        # every worker process opens the cache once and keeps its memory for the following instances
+        solutionCache = None if(cachePath is None) else getSolutionCache(GOAL_STATE, COLUMNS, cachePath)
+        if(solutionCache is not None):
+            moves = solutionCache.get(initialState)
+            if(moves is not None):
+                result['status'] = 'solved'
+                result['cached'] = True
+                result['moves'] = moves
+                result['length'] = len(moves)
+                result['nodesExpanded'] = 0
+                result['wallTime'] = time.time() - start
+                result['peakMemoryKB'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                return result
+
+        solverResult = availableSolvers[algorithm](initialState, heuristicName, budget, solutionCache)
+        [moves, nodesExpanded] = solverResult[0:2]
+        result['status'] = 'solved' if(moves is not None) else 'no_solution'
+        if(len(solverResult) > 2):
+            result.update(solverResult[2])
+        if(moves is not None and solutionCache is not None and algorithm in optimalSolvers):
+            solutionCache.put(initialState, moves)
+    except BudgetExceeded as error:
+        nodesExpanded = budget.nodesExpanded
+        result['status'] = 'budget_exceeded'
+        result['error'] = str(error)
+    except Exception as error:
+        nodesExpanded = budget.nodesExpanded
+        result['status'] = 'error'
+        result['error'] = type(error).__name__ + ': ' + str(error)
+
+    result['moves'] = moves
+    result['length'] = len(moves) if(moves is not None) else None
+    result['nodesExpanded'] = nodesExpanded
+    result['wallTime'] = time.time() - start
+    result['peakMemoryKB'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+# This method yields the tasks of all instances of the input file (empty lines and lines starting with # are skipped)
+def readTasks(inputFile, algorithm, heuristicName, nodeLimit, timeLimit, cachePath):
+    with open(inputFile, 'r') as f:
+        lineNumber = 0
+        for line in f:
+            lineNumber += 1
+            if(len(line.strip()) == 0 or line.lstrip().startswith('#')):
+                continue
+            yield (lineNumber, line, algorithm, heuristicName, nodeLimit, timeLimit, cachePath)
+
+
+# This method solves all instances of the input file on a pool of "workers" processes and writes the results to the output file
+# With freshWorkers every instance is solved by a new process, so peakMemoryKB is the peak memory of that instance alone
+# With cachePath the solutions are read from and stored in the solution cache at that path (see solutionCache.py)
+# Tables of the heuristic are built once before the pool is started, workers load them when they start (see prepareHeuristic)
+# Returns number of results for every status
+def runBatch(inputFile, outputFile, algorithm, heuristicName, workers=None, nodeLimit=None, timeLimit=None, freshWorkers=False, cachePath=None):
+    statusCounts = {}
+    heuristicNames = getHeuristicNames(algorithm)
+    if(heuristicNames is not None and heuristicName not in heuristicNames):
+        raise ValueError('unknown heuristic ' + str(heuristicName) + ' of ' + algorithm + ', available heuristics: ' + ', '.join(heuristicNames))
+    prepareHeuristic(algorithm, heuristicName)
+    tasks = readTasks(inputFile, algorithm, heuristicName, nodeLimit, timeLimit, cachePath)
+    with open(outputFile, 'w') as output:
+        with multiprocessing.Pool(workers, prepareHeuristic, (algorithm, heuristicName), maxtasksperchild=1 if(freshWorkers) else None) as pool:
+            for result in pool.imap_unordered(solveInstance, tasks):
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+                statusCounts[result['status']] = statusCounts.get(result['status'], 0) + 1
+    return statusCounts
+
+
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    # the search is parsed first, the heuristics it accepts are the choices of --heuristic
+    algorithmParser = argparse.ArgumentParser(add_help=False)
+    algorithmParser.add_argument('--algorithm', choices=sorted(availableSolvers.keys()), default='idastar')
+    [selected, remaining] = algorithmParser.parse_known_args()
+
+    parser = argparse.ArgumentParser(description='Solve many 15 Puzzle instances in parallel', parents=[algorithmParser])
+    parser.add_argument('input', help='file with one instance per line (16 tiles separated by spaces or commas)')
+    parser.add_argument('output', help='JSONL file the results are written to')
+    parser.add_argument('--heuristic', choices=getHeuristicNames(selected.algorithm), default='h2',
+        help='heuristic of A* and IDA* (see availableHeuristics of the script of the search)')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: number of cores)')
+    parser.add_argument('--node-limit', type=int, default=None, help='maximum number of expanded nodes per instance')
+    parser.add_argument('--time-limit', type=float, default=None, help='maximum number of seconds per instance')
+    parser.add_argument('--fresh-workers', action='store_true', help='solve every instance in a new process (exact peak memory)')
+    parser.add_argument('--cache', default=None, help='SQLite file of the solution cache (solved boards are reused and stored)')
+    arguments = parser.parse_args()
+
+    # Start time
+    start = time.time()
+
+    statusCounts = runBatch(arguments.input, arguments.output, arguments.algorithm, arguments.heuristic, arguments.workers,
+        arguments.node_limit, arguments.time_limit, arguments.fresh_workers, arguments.cache)
+
+    for status in sorted(statusCounts.keys()):
+        print(status + ': ', statusCounts[status])
+
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
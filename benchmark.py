@@ -0,0 +1,295 @@
+# Benchmark suite for the 15 Puzzle searches
+# Builds a fixed corpus of instances from a seed, stratified by the length of their optimal solution, and runs Breadth First Search,
+# Iterative Deepening Search, A* Search (misplaced tiles and manhattan distance) and IDA* Search on every instance with a node and time
+# budget. Every run is made in a new process, so the peak resident memory (RSS) of the process belongs to that run alone
+# Nodes expanded, nodes per second, wall time, peak RSS and peak memory allocated by Python (tracemalloc) are recorded for every run,
+# a comparison table is printed and all results are written to a JSON file which can be passed back as the baseline of a later run
+#
+# Usage: python benchmark.py --output benchmark.json --baseline previous.json
+import sys
+import json
+import time
+import random
+import platform
+import resource
+import argparse
+import tracemalloc
+import multiprocessing
+from puzzleState import SearchBudget, BudgetExceeded, FIFTEEN_PUZZLE_MOVES, INVERSE_MOVES
+from batchSolver import loadScript, GOAL_STATE, COLUMNS
+
+
+# Seed of the corpus
+BENCHMARK_SEED = 411
+
+# Lengths of optimal solutions the corpus is stratified by, and number of instances of every length
+BENCHMARK_STRATA = [4, 8, 12, 16, 20]
+INSTANCES_PER_STRATUM = 3
+
+# Default budget of every run
+BENCHMARK_NODE_LIMIT = 1000000
+BENCHMARK_TIME_LIMIT = 60
+
+# Maximum number of random walks tried for every stratum of the corpus, and maximum number of nodes expanded to find the
+# optimal length of one walk (walks exceeding it are skipped)
+CORPUS_ATTEMPTS_PER_STRATUM = 1000
+CORPUS_NODE_LIMIT = 1000000
+
+
+# The methods below run one of the searches on an instance and return [moves or None if there is no solution, nodes expanded]
+
+# Breadth First Search (Node objects, Assignment3-15Puzzle.py)
+def runBreadthFirstSearch(initialState, budget):
+    bfs = loadScript('Assignment3-15Puzzle.py')
+    [moves, nodesExpanded, searchStats] = bfs.breadthFirstSearch(bfs.Node(list(initialState), COLUMNS), GOAL_STATE, budget)
+    return [moves if(len(moves) > 0 or initialState == GOAL_STATE) else None, nodesExpanded]
+
+
+# Iterative Deepening Search (Assignment_4.py)
+def runIterativeDeepeningSearch(initialState, budget):
+    ids = loadScript('Assignment_4.py')
+    ids.Node.columns = COLUMNS
+    [result, nodesExpanded] = ids.iterativeDeepeningSearch(ids.Node(list(initialState)), GOAL_STATE, budget)
+    return [result.moves if(result) else None, nodesExpanded]
+
+
+# A* Search (Assignment_5.py) with a heuristic of availableHeuristics
+def runAStarSearch(initialState, budget, heuristicName):
+    astar = loadScript('Assignment_5.py')
+    astar.Node.columns = COLUMNS
+    astar.Node.goalState = GOAL_STATE
+    [solution, nodesExpanded] = astar.AStarSearch(astar.Node(list(initialState), astar.availableHeuristics[heuristicName]), GOAL_STATE, budget)
+    return [solution.moves if(solution) else None, nodesExpanded]
+
+
+# IDA* Search (Node objects, assignment6.py) with a heuristic of availableHeuristics
+def runIDAStarSearch(initialState, budget, heuristicName):
+    idastar = loadScript('assignment6.py')
+    idastar.Node.columns = COLUMNS
+    idastar.Node.goalState = GOAL_STATE
+    result = idastar.IDAStar(idastar.Node(list(initialState), idastar.availableHeuristics[heuristicName]), GOAL_STATE, budget)
+    if(result[0] == "NOT_FOUND"):
+        return [None, budget.nodesExpanded]
+    [path, cutOff, nodesExpanded] = result
+    return [path[len(path) - 1].moves, nodesExpanded]
+
+
+# Searches of the benchmark, name -> (method, extra arguments)
+benchmarkSearches = {
+    'bfs': (runBreadthFirstSearch, ()),
+    'ids': (runIterativeDeepeningSearch, ()),
+    'astar-h1': (runAStarSearch, ('h1',)),
+    'astar-h2': (runAStarSearch, ('h2',)),
+    'idastar-h2': (runIDAStarSearch, ('h2',))
+}
+
+
+# This method returns the length of the optimal solution of an instance (lean IDA* with manhattan distance), or None if more than
+# nodeLimit nodes would have to be expanded to find it
+def optimalLength(state, nodeLimit=CORPUS_NODE_LIMIT):
+    idastar = loadScript('assignment6.py')
+    try:
+        [moves, cutOff, nodesExpanded] = idastar.leanIDAStar(state, GOAL_STATE, idastar.manhattanDistanceHeuristic, COLUMNS, SearchBudget(nodeLimit))
+    except BudgetExceeded:
+        return None
+    return len(moves)
+
+
+# This method returns the state reached from the goal state by a random walk of "length" moves, a move never undoes the previous one
+def randomWalk(generator, length):
+    state = list(GOAL_STATE)
+    indexOfZero = state.index(0)
+    lastMove = None
+    for step in range(0, length):
+        moves = [(move, newIndexOfZero) for (move, newIndexOfZero) in FIFTEEN_PUZZLE_MOVES[indexOfZero] if(move != INVERSE_MOVES.get(lastMove))]
+        [lastMove, newIndexOfZero] = generator.choice(moves)
+        state[indexOfZero], state[newIndexOfZero] = state[newIndexOfZero], 0
+        indexOfZero = newIndexOfZero
+    return state
+
+
+# This method builds the corpus, instancesPerStratum distinct instances with an optimal solution of every length of strata
+# Instances are random walks from the goal state, a walk is kept only if its optimal solution has exactly the wanted length
+# The corpus only depends on the seed, the strata and instancesPerStratum
+# Raises ValueError if a stratum does not have enough instances after CORPUS_ATTEMPTS_PER_STRATUM walks (e.g. length 0, only the
+# goal state has it)
+def buildCorpus(seed=BENCHMARK_SEED, strata=BENCHMARK_STRATA, instancesPerStratum=INSTANCES_PER_STRATUM):
+    generator = random.Random(seed)
+    corpus = []
+    seen = set()
+    for length in strata:
+        found = 0
+        attempts = 0
+        while(found < instancesPerStratum):
+            if(attempts == CORPUS_ATTEMPTS_PER_STRATUM):
+                raise ValueError('found only ' + str(found) + ' of ' + str(instancesPerStratum) + ' instances with optimal solution length '
+                    + str(length) + ' in ' + str(attempts) + ' random walks')
+            attempts += 1
+            # walks longer than the wanted length are needed when shorter walks keep finding shortcuts
+            state = randomWalk(generator, length + 2 * generator.randint(0, 2))
+            if(tuple(state) in seen or optimalLength(state) != length):
+                continue
+            seen.add(tuple(state))
+            corpus.append({'stratum': length, 'index': found, 'state': state})
+            found += 1
+    return corpus
+
+
+# This method makes one run in a worker process and returns its measurements
+# Task is (search, corpus entry, node limit, time limit, traceMemory). With traceMemory Python allocations are traced (tracemalloc),
+# which slows the search down, so the runs measuring time and the runs measuring allocations are separate
+def measureRun(task):
+    [searchName, entry, nodeLimit, timeLimit, traceMemory] = task
+    [method, arguments] = benchmarkSearches[searchName]
+    result = {
+        'search': searchName,
+        'stratum': entry['stratum'],
+        'index': entry['index']
+    }
+
+    # the scripts are loaded before measuring, so loading them does not count as memory or time of the search
+    for fileName in ['Assignment3-15Puzzle.py', 'Assignment_4.py', 'Assignment_5.py', 'assignment6.py']:
+        loadScript(fileName)
+    result['baselineRssKB'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    budget = SearchBudget(nodeLimit, timeLimit)
+    if(traceMemory):
+        tracemalloc.start()
+    start = time.perf_counter()
+    moves = None
+    try:
+        [moves, nodesExpanded] = method(entry['state'], budget, *arguments)
+        result['status'] = 'solved' if(moves is not None) else 'no_solution'
+    except BudgetExceeded:
+        nodesExpanded = budget.nodesExpanded
+        result['status'] = 'budget_exceeded'
+    wallTime = time.perf_counter() - start
+    if(traceMemory):
+        result['tracemallocPeakKB'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+        return result
+
+    result['length'] = len(moves) if(moves is not None) else None
+    result['nodesExpanded'] = nodesExpanded
+    result['wallTime'] = wallTime
+    result['nodesPerSecond'] = nodesExpanded / wallTime if(wallTime > 0) else None
+    result['peakRssKB'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+# This method runs every search on every instance of the corpus, one run at a time and every run in a new process
+# Returns the list of runs (the tracemalloc peak of the separate allocation run is merged into the run measuring time)
+def runBenchmark(corpus, searchNames, nodeLimit=BENCHMARK_NODE_LIMIT, timeLimit=BENCHMARK_TIME_LIMIT, traceMemory=True):
+    tasks = [(searchName, entry, nodeLimit, timeLimit, False) for searchName in searchNames for entry in corpus]
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        runs = list(pool.imap(measureRun, tasks))
+        if(traceMemory):
+            memoryTasks = [(searchName, entry, nodeLimit, timeLimit, True) for (searchName, entry, nodeLimit, timeLimit, trace) in tasks]
+            for run, memoryRun in zip(runs, pool.imap(measureRun, memoryTasks)):
+                run['tracemallocPeakKB'] = memoryRun['tracemallocPeakKB']
+    return runs
+
+
+# This method returns the median of a non empty list
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if(len(values) % 2 == 1) else (values[middle - 1] + values[middle]) / 2
+
+
+# This method summarizes the runs of every (search, stratum)
+def summarizeRuns(runs):
+    groups = {}
+    for run in runs:
+        groups.setdefault((run['search'], run['stratum']), []).append(run)
+    summary = []
+    for [searchName, stratum], groupRuns in groups.items():
+        totalNodes = sum(run['nodesExpanded'] for run in groupRuns)
+        totalTime = sum(run['wallTime'] for run in groupRuns)
+        summary.append({
+            'search': searchName,
+            'stratum': stratum,
+            'runs': len(groupRuns),
+            'solved': len([run for run in groupRuns if(run['status'] == 'solved')]),
+            'medianWallTime': median([run['wallTime'] for run in groupRuns]),
+            'medianNodesExpanded': median([run['nodesExpanded'] for run in groupRuns]),
+            'nodesPerSecond': totalNodes / totalTime if(totalTime > 0) else None,
+            'maxPeakRssKB': max(run['peakRssKB'] for run in groupRuns),
+            'maxTracemallocPeakKB': max(run['tracemallocPeakKB'] for run in groupRuns) if('tracemallocPeakKB' in groupRuns[0]) else None
+        })
+    return summary
+
+
+# This method prints the comparison table of the summary, with the median wall time relative to the baseline summary if it is given
+def printSummary(summary, baselineSummary=None):
+    baseline = {}
+    if(baselineSummary is not None):
+        for row in baselineSummary:
+            baseline[(row['search'], row['stratum'])] = row
+    header = ['search', 'length', 'solved', 'time (s)', 'nodes', 'nodes/s', 'peak RSS (KB)', 'tracemalloc (KB)']
+    if(baselineSummary is not None):
+        header.append('time vs baseline')
+    print(''.join(column.rjust(18) for column in header))
+    for row in summary:
+        cells = [
+            row['search'],
+            str(row['stratum']),
+            str(row['solved']) + '/' + str(row['runs']),
+            '%.4f' % row['medianWallTime'],
+            str(int(row['medianNodesExpanded'])),
+            '-' if(row['nodesPerSecond'] is None) else '%.0f' % row['nodesPerSecond'],
+            str(row['maxPeakRssKB']),
+            '-' if(row['maxTracemallocPeakKB'] is None) else '%.0f' % row['maxTracemallocPeakKB']
+        ]
+        if(baselineSummary is not None):
+            previous = baseline.get((row['search'], row['stratum']))
+            if(previous is None or previous['medianWallTime'] == 0):
+                cells.append('-')
+            else:
+                cells.append('%.2fx' % (row['medianWallTime'] / previous['medianWallTime']))
+        print(''.join(cell.rjust(18) for cell in cells))
+
+
+# Run the program only when the file is executed directly, not when it is imported
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark BFS, IDS, A* and IDA* on a fixed corpus of 15 Puzzle instances')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file the corpus, runs and summary are written to')
+    parser.add_argument('--baseline', default=None, help='JSON file of an earlier benchmark to compare the wall times with')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--strata', type=int, nargs='+', default=BENCHMARK_STRATA, help='lengths of optimal solutions in the corpus')
+    parser.add_argument('--instances', type=int, default=INSTANCES_PER_STRATUM, help='number of instances of every length')
+    parser.add_argument('--searches', nargs='+', choices=list(benchmarkSearches.keys()), default=list(benchmarkSearches.keys()))
+    parser.add_argument('--node-limit', type=int, default=BENCHMARK_NODE_LIMIT, help='maximum number of expanded nodes per run')
+    parser.add_argument('--time-limit', type=float, default=BENCHMARK_TIME_LIMIT, help='maximum number of seconds per run')
+    parser.add_argument('--no-tracemalloc', action='store_true', help='skip the runs measuring Python allocations')
+    arguments = parser.parse_args()
+
+    # Start time
+    start = time.time()
+
+    corpus = buildCorpus(arguments.seed, arguments.strata, arguments.instances)
+    runs = runBenchmark(corpus, arguments.searches, arguments.node_limit, arguments.time_limit, not(arguments.no_tracemalloc))
+    summary = summarizeRuns(runs)
+
+    baselineSummary = None
+    if(arguments.baseline is not None):
+        with open(arguments.baseline, 'r') as f:
+            baselineSummary = json.load(f)['summary']
+    printSummary(summary, baselineSummary)
+
+    with open(arguments.output, 'w') as f:
+        json.dump({
+            'seed': arguments.seed,
+            'strata': arguments.strata,
+            'instancesPerStratum': arguments.instances,
+            'nodeLimit': arguments.node_limit,
+            'timeLimit': arguments.time_limit,
+            'python': sys.version,
+            'platform': platform.platform(),
+            'corpus': corpus,
+            'runs': runs,
+            'summary': summary
+        }, f, indent=2)
+
+    # Print time taken by program (end - start)
+    print('Time Taken: ', (time.time() - start), ' seconds')
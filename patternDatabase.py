@@ -0,0 +1,219 @@
+# Additive Pattern Database heuristic for the 15 Puzzle Problem
+# The tiles are split into disjoint patterns, for every pattern a database stores the minimum number of moves of the pattern tiles
+# needed to bring them from any placement to their goal positions (moves of other tiles are free), so the values of all
+# patterns can be added and the sum is still an admissible heuristic
+# Databases are built with a backward Breadth First Search from the goal state, stored on disk as byte arrays (one byte per
+# placement of the pattern tiles) and memory-mapped when they are loaded
+import os
+import mmap
+import itertools
+
+
+# Disjoint partitions of the tiles into patterns
+PATTERN_PARTITIONS = {
+    # 5-5-5, each database has 524160 entries and builds in well under a minute
+    '555': [[1, 2, 3, 5, 6], [4, 7, 8, 11, 12], [9, 10, 13, 14, 15]],
+    # 6-6-3, the two large databases have 5765760 entries each and take a few minutes (and about 600 MB of memory) to build
+    '663': [[1, 5, 6, 9, 10, 13], [7, 8, 11, 12, 14, 15], [2, 3, 4]]
+}
+
+# Partition used by patternDatabaseHeuristic
+DEFAULT_PARTITION = '663'
+
+# Directory where the databases are stored
+DATABASE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+
+# Value of the entries which have not been reached by the search
+UNREACHED = 255
+
+
+# This class represent an additive pattern database, one byte array (memory-mapped file) for every pattern of the partition
+class PatternDatabase:
+
+    # This method executes when PatternDatabase class is instantiated (a constructor method), takes the patterns and their tables
+    def __init__(self, patterns, tables, size):
+        self.patterns = patterns
+        self.tables = tables
+        self.size = size
+
+    # This method returns the heuristic value of a state, the sum of the values of every pattern
+    def getValue(self, state):
+        positions = [0] * self.size
+        for index in range(0, self.size):
+            positions[state[index]] = index
+        totalValue = 0
+        for patternIndex in range(0, len(self.patterns)):
+            totalValue += self.tables[patternIndex][rankPlacement([positions[tile] for tile in self.patterns[patternIndex]], self.size)]
+        return totalValue
+
+
+# This method returns the rank of a placement (distinct positions of the pattern tiles) in lexicographic order of all placements
+# which is the index of that placement in the database
+def rankPlacement(placement, size):
+    rank = 0
+    usedPositions = 0
+    for index in range(0, len(placement)):
+        position = placement[index]
+        # number of free positions lower than the position of this tile
+        rank = rank * (size - index) + position - (usedPositions & ((1 << position) - 1)).bit_count()
+        usedPositions |= 1 << position
+    return rank
+
+
+# This method returns the number of placements of "tiles" pattern tiles on a board with "size" positions
+def countPlacements(tiles, size):
+    count = 1
+    for index in range(0, tiles):
+        count *= size - index
+    return count
+
+
+# This method builds, for every position of the board, the bit mask of its neighbouring positions
+def buildNeighbourMasks(rows, columns):
+    neighbourMasks = []
+    for index in range(0, rows * columns):
+        mask = 0
+        if(index % columns > 0):
+            mask |= 1 << (index - 1)
+        if(index % columns < columns - 1):
+            mask |= 1 << (index + 1)
+        if(index - columns >= 0):
+            mask |= 1 << (index - columns)
+        if(index + columns < rows * columns):
+            mask |= 1 << (index + columns)
+        neighbourMasks.append(mask)
+    return neighbourMasks
+
+
+# This method returns the bit mask of the region of free positions (not occupied by pattern tiles) the blank can reach from "start"
+def findBlankRegion(start, occupied, neighbourMasks):
+    region = 1 << start
+    frontier = region
+    while(frontier):
+        grown = 0
+        while(frontier):
+            lowestBit = frontier & -frontier
+            grown |= neighbourMasks[lowestBit.bit_length() - 1]
+            frontier ^= lowestBit
+        grown &= ~occupied & ~region
+        region |= grown
+        frontier = grown
+    return region
+
+
+# This method builds the database of one pattern with backward Breadth First Search from the goal state
+# Abstract states are the positions of pattern tiles and the region the blank can move in without moving a pattern tile,
+# so every move of the search moves one pattern tile and costs 1
+# Returns the byte array of the database indexed by rankPlacement
+def buildPatternTable(pattern, goalState, columns):
+    size = len(goalState)
+    rows = size // columns
+    tiles = len(pattern)
+    neighbourMasks = buildNeighbourMasks(rows, columns)
+
+    # abstract states are packed as 4 bits per pattern tile position, followed by 4 bits of the lowest position of blank region
+    # distance of a placement is stored in a sparse table indexed by the packed positions
+    sparseTable = bytearray([UNREACHED]) * (1 << (4 * tiles))
+    visited = bytearray((1 << (4 * (tiles + 1))) >> 3)
+
+    goalPositions = [goalState.index(tile) for tile in pattern]
+    packedPositions = 0
+    occupied = 0
+    for tileIndex in range(0, tiles):
+        packedPositions |= goalPositions[tileIndex] << (4 * tileIndex)
+        occupied |= 1 << goalPositions[tileIndex]
+    region = findBlankRegion(goalState.index(0), occupied, neighbourMasks)
+
+    key = (packedPositions << 4) | ((region & -region).bit_length() - 1)
+    visited[key >> 3] |= 1 << (key & 7)
+    sparseTable[packedPositions] = 0
+
+    # layer of the search as list of (packed positions, occupied positions, blank region)
+    layer = [(packedPositions, occupied, region)]
+    distance = 0
+
+    while(len(layer) > 0):
+        distance += 1
+        nextLayer = []
+        for [packedPositions, occupied, region] in layer:
+            for tileIndex in range(0, tiles):
+                position = (packedPositions >> (4 * tileIndex)) & 15
+                # pattern tile can move to any neighbouring position which the blank can reach
+                targets = neighbourMasks[position] & region
+                while(targets):
+                    targetBit = targets & -targets
+                    targets ^= targetBit
+                    target = targetBit.bit_length() - 1
+
+                    newPackedPositions = packedPositions ^ ((position ^ target) << (4 * tileIndex))
+                    newOccupied = occupied ^ (1 << position) ^ targetBit
+                    newRegion = findBlankRegion(position, newOccupied, neighbourMasks)
+                    key = (newPackedPositions << 4) | ((newRegion & -newRegion).bit_length() - 1)
+                    if(visited[key >> 3] & (1 << (key & 7))):
+                        continue
+                    visited[key >> 3] |= 1 << (key & 7)
+                    if(sparseTable[newPackedPositions] == UNREACHED):
+                        sparseTable[newPackedPositions] = distance
+                    nextLayer.append((newPackedPositions, newOccupied, newRegion))
+        layer = nextLayer
+
+    # compact table, placements are enumerated in lexicographic order which is the order of rankPlacement
+    table = bytearray(countPlacements(tiles, size))
+    rank = 0
+    for placement in itertools.permutations(range(0, size), tiles):
+        packedPositions = 0
+        for tileIndex in range(0, tiles):
+            packedPositions |= placement[tileIndex] << (4 * tileIndex)
+        table[rank] = sparseTable[packedPositions]
+        rank += 1
+    return table
+
+
+# This method returns the path of the database file of a pattern
+def getDatabasePath(pattern, goalState, directory):
+    return os.path.join(directory, 'pdb-' + '_'.join(str(tile) for tile in goalState) + '-' + '_'.join(str(tile) for tile in pattern) + '.bin')
+
+
+# This method loads (memory-maps) the database of a pattern, the database is built and stored first if it does not exist on disk
+def loadPatternTable(pattern, goalState, columns, directory):
+    path = getDatabasePath(pattern, goalState, directory)
+    if(not(os.path.exists(path))):
+        table = buildPatternTable(pattern, goalState, columns)
+        os.makedirs(directory, exist_ok=True)
+        # write to a temporary file first so a half written database is never loaded
+        with open(path + '.tmp', 'wb') as f:
+            f.write(table)
+        os.replace(path + '.tmp', path)
+    with open(path, 'rb') as f:
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if(len(table) != countPlacements(len(pattern), len(goalState))):
+        raise ValueError('pattern database ' + path + ' has wrong size')
+    return table
+
+
+# This method returns the additive pattern database of a partition (see PATTERN_PARTITIONS)
+def loadPatternDatabase(goalState, columns, partition=DEFAULT_PARTITION, directory=None):
+    if(directory is None):
+        directory = DATABASE_DIRECTORY
+    if(len(goalState) != 16):
+        raise ValueError('pattern databases are only available for the 15 Puzzle')
+    patterns = PATTERN_PARTITIONS[partition]
+    tables = [loadPatternTable(pattern, goalState, columns, directory) for pattern in patterns]
+    return PatternDatabase(patterns, tables, len(goalState))
+
+
+# Loaded databases for every (goal state, partition)
+loadedDatabases = {}
+
+
+# This method returns the loaded pattern database of a goal state, it is loaded (or built) only once
+def getPatternDatabase(goalState, columns, partition=DEFAULT_PARTITION):
+    key = (tuple(goalState), partition)
+    if(key not in loadedDatabases):
+        loadedDatabases[key] = loadPatternDatabase(goalState, columns, partition)
+    return loadedDatabases[key]
+
+
+# This method returns the additive pattern database heuristic of a state, the sum of pattern database values of all patterns
+def patternDatabaseHeuristic(state, goalState, gameSize):
+    return getPatternDatabase(goalState, gameSize).getValue(state)
@@ -0,0 +1,170 @@
+# Compact (packed integer) state representation for the 15 Puzzle Problem
+# Every tile is stored in 4 bits, tile at index i of the board lives in bits [4 * i, 4 * i + 4) of a single integer
+# so the whole 4x4 board fits in a 64 bit integer which can be used directly as a key of a set or dictionary
+# The blank (0) is always stored as 0 bits, that is why a move is just two XOR operations on the packed integer
+# Boards with more than MAX_PACKED_TILES cells (or tiles greater than TILE_MASK) do not fit and are rejected by packState
+import time
+
+
+# Number of bits used to store one tile
+TILE_BITS = 4
+
+# Mask to extract one tile
+TILE_MASK = (1 << TILE_BITS) - 1
+
+# Maximum number of cells of a board whose states can be packed (tiles 0 to TILE_MASK)
+MAX_PACKED_TILES = 1 << TILE_BITS
+
+# Move made by the blank and the move which undoes it
+INVERSE_MOVES = {
+    'L': 'R',
+    'R': 'L',
+    'U': 'D',
+    'D': 'U'
+}
+
+
+# This method packs the list representation of a state into a single integer
+# Raises ValueError if the state has more than MAX_PACKED_TILES cells or a tile which does not fit in TILE_BITS bits, packing
+# such a state would silently mix up its tiles
+def packState(state):
+    if(len(state) > MAX_PACKED_TILES):
+        raise ValueError('states of boards with more than ' + str(MAX_PACKED_TILES) + ' cells can not be packed, got ' + str(len(state)) + ' cells')
+    packed = 0
+    for index in range(len(state) - 1, -1, -1):
+        if(state[index] < 0 or state[index] > TILE_MASK):
+            raise ValueError('tile ' + str(state[index]) + ' can not be packed in ' + str(TILE_BITS) + ' bits')
+        packed = (packed << TILE_BITS) | state[index]
+    return packed
+
+
+# This method unpacks the packed integer back into the list representation of a state with "size" tiles
+def unpackState(packed, size):
+    return [(packed >> (TILE_BITS * index)) & TILE_MASK for index in range(0, size)]
+
+
+# This method returns the tile at a particular index of the packed state
+def getTile(packed, index):
+    return (packed >> (TILE_BITS * index)) & TILE_MASK
+
+
+# This method returns the index of 0 (blank) in a packed state with "size" tiles
+def findBlankIndex(packed, size):
+    for index in range(0, size):
+        if(((packed >> (TILE_BITS * index)) & TILE_MASK) == 0):
+            return index
+    return -1
+
+
+# This method slides the tile at newBlankIndex into the blank at blankIndex and returns the new packed state
+def applyMove(packed, blankIndex, newBlankIndex):
+    tile = (packed >> (TILE_BITS * newBlankIndex)) & TILE_MASK
+    return packed ^ (tile << (TILE_BITS * newBlankIndex)) ^ (tile << (TILE_BITS * blankIndex))
+
+
+# This method builds, for every position of the blank, the list of possible moves as (move, new index of blank)
+# moves are generated in the same order (L, R, U, D) as expandState of the Node based searches
+def buildMoveTable(rows, columns):
+    moveTable = []
+    for index in range(0, rows * columns):
+        moves = []
+        if(index % columns > 0):
+            moves.append(('L', index - 1))
+        if(index % columns < columns - 1):
+            moves.append(('R', index + 1))
+        if(index - columns >= 0):
+            moves.append(('U', index - columns))
+        if(index + columns < rows * columns):
+            moves.append(('D', index + columns))
+        moveTable.append(tuple(moves))
+    return moveTable
+
+
+# Move table for the 4x4 board of 15 Puzzle
+FIFTEEN_PUZZLE_MOVES = buildMoveTable(4, 4)
+
+
+# This method expands a packed state and returns the list of children as (packed state, index of blank, move)
+def expandPackedState(packed, blankIndex, moveTable=FIFTEEN_PUZZLE_MOVES):
+    children = []
+    for move, newBlankIndex in moveTable[blankIndex]:
+        children.append((applyMove(packed, blankIndex, newBlankIndex), newBlankIndex, move))
+    return children
+
+
+# This exception is raised by a search when its budget (number of expanded nodes or time) is exhausted
+class BudgetExceeded(Exception):
+    pass
+
+
+# This class represent the budget of a search, the search charges it for every node it expands
+# nodeLimit is the maximum number of expanded nodes and timeLimit the maximum number of seconds (None means no limit)
+class SearchBudget:
+
+    # Number of charged nodes between two checks of the clock
+    CLOCK_CHECK_INTERVAL = 1024
+
+    # This method executes when SearchBudget class is instantiated (a constructor method)
+    def __init__(self, nodeLimit=None, timeLimit=None):
+        self.nodeLimit = nodeLimit
+        self.deadline = None if(timeLimit is None) else time.time() + timeLimit
+        self.nodesExpanded = 0
+
+    # This method charges the budget for one expanded node and raises BudgetExceeded if the budget is exhausted
+    def charge(self):
+        self.nodesExpanded += 1
+        if(self.nodeLimit is not None and self.nodesExpanded > self.nodeLimit):
+            raise BudgetExceeded('node limit of ' + str(self.nodeLimit) + ' expanded nodes reached')
+        if(self.deadline is not None and self.nodesExpanded % self.CLOCK_CHECK_INTERVAL == 0 and time.time() > self.deadline):
+            raise BudgetExceeded('time limit reached')
+
+
+# This method returns the goal state of a board with "size" tiles, tiles in order followed by the blank (0) in the last index
+def buildGoalState(size):
+    return list(range(1, size)) + [0]
+
+
+# This method checks in O(n) if the goal state can be reached from a state of a board with "columns" columns (any N x M board)
+# Every move swaps the blank with a tile and moves the blank one row or column, so the parity of the permutation between the state
+# and the goal (blank included) always equals the parity of the manhattan distance between their blanks. On a board with 2 or more
+# rows and columns every state with matching parities is solvable. The permutation parity is found from its cycles instead of
+# counting inversions, a permutation of n items with c cycles has parity (n - c) mod 2
+# Returns False as well if the state does not contain the same tiles as the goal state
+def isSolvable(state, goalState, columns):
+    size = len(goalState)
+    if(len(state) != size or size % columns != 0):
+        return False
+
+    # goal index of every tile
+    goalPositions = {}
+    for index in range(0, size):
+        goalPositions[goalState[index]] = index
+    permutation = []
+    for tile in state:
+        if(tile not in goalPositions):
+            return False
+        permutation.append(goalPositions[tile])
+    if(len(set(permutation)) != size):
+        return False
+
+    rows = size // columns
+    if(rows == 1 or columns == 1):
+        # tiles of a single line can never pass each other, only the blank can move
+        return [tile for tile in state if(tile != 0)] == [tile for tile in goalState if(tile != 0)]
+
+    # count the cycles of the permutation
+    visited = bytearray(size)
+    cycles = 0
+    for index in range(0, size):
+        if(visited[index]):
+            continue
+        cycles += 1
+        while(not(visited[index])):
+            visited[index] = 1
+            index = permutation[index]
+    permutationParity = (size - cycles) % 2
+
+    blankIndex = state.index(0)
+    goalBlankIndex = goalPositions[0]
+    blankDistance = abs(blankIndex // columns - goalBlankIndex // columns) + abs(blankIndex % columns - goalBlankIndex % columns)
+    return permutationParity == blankDistance % 2
@@ -0,0 +1,120 @@
+# Persistent cache of optimal solutions of the 15 Puzzle Problem
+# Solutions are stored on disk in a SQLite database keyed by the packed state and the board (goal state and columns), the
+# most recently used ones are kept in memory as well (LRU) so that repeated boards and lookups made during a search never
+# touch the disk. Every state on an optimal path has the rest of that path as its optimal solution, so storing a solution
+# stores the solution of every state on its path
+import os
+import sqlite3
+from collections import OrderedDict
+from puzzleState import packState, buildMoveTable
+
+
+# Default path of the database file
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables', 'solutions.sqlite')
+
+# Default maximum number of solutions kept in memory
+MEMORY_CACHE_SIZE = 100000
+
+# Seconds a process waits for the database when another process is writing to it
+DATABASE_TIMEOUT = 30
+
+
+# This class represent the solution cache of one board (goal state and number of columns)
+class SolutionCache:
+
+    # This method executes when SolutionCache class is instantiated (a constructor method), takes the goal state, number of columns,
+    # path of the database file (None keeps the solutions in memory only) and maximum number of solutions kept in memory
+    def __init__(self, goalState, columns, path=CACHE_PATH, maxEntries=MEMORY_CACHE_SIZE):
+        self.goalState = list(goalState)
+        self.columns = columns
+        self.board = str(columns) + ':' + format(packState(goalState), 'x')
+        self.moveTable = buildMoveTable(len(goalState) // columns, columns)
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        if(path is not None):
+            directory = os.path.dirname(path)
+            if(len(directory) > 0):
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(path, timeout=DATABASE_TIMEOUT)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS solutions (board TEXT, state TEXT, moves TEXT, PRIMARY KEY (board, state)) WITHOUT ROWID')
+            self.connection.commit()
+
+    # This method adds a solution to the memory, the least recently used solution is dropped when the memory is full
+    def remember(self, packedState, moves):
+        self.entries[packedState] = moves
+        self.entries.move_to_end(packedState)
+        if(len(self.entries) > self.maxEntries):
+            self.entries.popitem(last=False)
+
+    # This method returns the optimal moves of a packed state if they are in memory, otherwise None (the disk is not read)
+    # It is cheap enough to be called for every node of a search
+    def lookup(self, packedState):
+        moves = self.entries.get(packedState)
+        if(moves is not None):
+            self.entries.move_to_end(packedState)
+        return moves
+
+    # This method returns the optimal moves of a state (list of tiles), or None if the state is not in the cache
+    def get(self, state):
+        packedState = packState(state)
+        moves = self.lookup(packedState)
+        if(moves is None and self.connection is not None):
+            row = self.connection.execute('SELECT moves FROM solutions WHERE board = ? AND state = ?', (self.board, format(packedState, 'x'))).fetchone()
+            if(row is not None):
+                moves = row[0]
+                self.remember(packedState, moves)
+        if(moves is None):
+            self.misses += 1
+        else:
+            self.hits += 1
+        return moves
+
+    # This method stores the optimal moves of a state (list of tiles) and of every state on its path to the goal
+    def put(self, state, moves):
+        state = list(state)
+        indexOfZero = state.index(0)
+        rows = []
+        for position in range(0, len(moves) + 1):
+            packedState = packState(state)
+            self.remember(packedState, moves[position:])
+            rows.append((self.board, format(packedState, 'x'), moves[position:]))
+            if(position < len(moves)):
+                newIndexOfZero = dict(self.moveTable[indexOfZero])[moves[position]]
+                state[indexOfZero], state[newIndexOfZero] = state[newIndexOfZero], 0
+                indexOfZero = newIndexOfZero
+        if(self.connection is not None):
+            self.connection.executemany('INSERT OR IGNORE INTO solutions (board, state, moves) VALUES (?, ?, ?)', rows)
+            self.connection.commit()
+
+    # This method loads the solutions of this board stored on disk into memory, up to the size of the memory, so lookups made
+    # during a search find them as well
+    def warmUp(self):
+        if(self.connection is None):
+            return
+        for [state, moves] in self.connection.execute('SELECT state, moves FROM solutions WHERE board = ? LIMIT ?', (self.board, self.maxEntries)):
+            self.remember(int(state, 16), moves)
+
+    # This method closes the database
+    def close(self):
+        if(self.connection is not None):
+            self.connection.close()
+            self.connection = None
+
+
+# Opened caches for every (goal state, columns, path)
+openedCaches = {}
+
+
+# This method returns the solution cache of a board, it is opened only once per process so its memory is shared by all searches
+# The solutions stored on disk are loaded into memory when the cache is opened (see warmUp), so the lookups made during a search
+# find the states solved by earlier runs and not only the initial state
+def getSolutionCache(goalState, columns, path=CACHE_PATH):
+    key = (tuple(goalState), columns, path)
+    if(key not in openedCaches):
+        openedCaches[key] = SolutionCache(goalState, columns, path)
+        openedCaches[key].warmUp()
+    return openedCaches[key]
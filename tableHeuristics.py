@@ -0,0 +1,232 @@
+# Linear Conflict and Walking Distance heuristics for the 15 Puzzle Problem
+# Both heuristics are backed by lookup tables which are built once for a goal state and cached on disk, evaluating them for a state
+# is only a sum of per (tile, index) table values followed by a few lookups, so their cost stays close to manhattan distance
+import os
+import json
+
+
+# Directory where the tables are stored
+TABLE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+# Number of bits used by one count of walking distance matrix
+WALKING_DISTANCE_BITS = 3
+
+
+# This method returns the index of every tile in the goal state, goalPositions[tile] = index
+def buildGoalPositions(goalState):
+    goalPositions = [0] * len(goalState)
+    for index in range(0, len(goalState)):
+        goalPositions[goalState[index]] = index
+    return goalPositions
+
+
+# This method returns the length of the longest increasing subsequence of a list
+def longestIncreasingSubsequence(items):
+    lengths = []
+    for index in range(0, len(items)):
+        length = 1
+        for previousIndex in range(0, index):
+            if(items[previousIndex] < items[index] and lengths[previousIndex] + 1 > length):
+                length = lengths[previousIndex] + 1
+        lengths.append(length)
+    return max(lengths) if(len(lengths) > 0) else 0
+
+
+# This method builds the linear conflict table of a line (row or column) of "lineLength" positions
+# A line is encoded in base (lineLength + 1), digit of every position is 0 if the tile there does not belong to this line
+# otherwise 1 + its goal position in the line. Value is the number of extra moves, 2 for every tile which has to leave
+# the line so that the remaining tiles are in the right order
+def buildLinearConflictTable(lineLength):
+    base = lineLength + 1
+    table = []
+    for key in range(0, base ** lineLength):
+        goalPositionsInLine = []
+        digits = key
+        for position in range(0, lineLength):
+            if(digits % base > 0):
+                goalPositionsInLine.append(digits % base - 1)
+            digits //= base
+        table.append(2 * (len(goalPositionsInLine) - longestIncreasingSubsequence(goalPositionsInLine)))
+    return table
+
+
+# This method builds the walking distance table with Breadth First Search from the goal
+# State is a matrix where entry [line][goalLine] is the number of tiles in "line" whose goal is in "goalLine", with the line of blank,
+# a move takes a tile from a line next to the blank into the line of blank. Matrix and line of blank are packed into an integer
+# (see packWalkingDistance), returns dictionary packed matrix -> number of moves
+def buildWalkingDistanceTable(goalMatrix, goalBlankLine):
+    lines = len(goalMatrix)
+    goalKey = packWalkingDistance(goalMatrix, goalBlankLine)
+    table = {goalKey: 0}
+    layer = [(goalMatrix, goalBlankLine)]
+    distance = 0
+    while(len(layer) > 0):
+        distance += 1
+        nextLayer = []
+        for [matrix, blankLine] in layer:
+            for line in [blankLine - 1, blankLine + 1]:
+                if(line < 0 or line >= lines):
+                    continue
+                for goalLine in range(0, lines):
+                    if(matrix[line][goalLine] == 0):
+                        continue
+                    newMatrix = [list(row) for row in matrix]
+                    newMatrix[line][goalLine] -= 1
+                    newMatrix[blankLine][goalLine] += 1
+                    key = packWalkingDistance(newMatrix, line)
+                    if(key in table):
+                        continue
+                    table[key] = distance
+                    nextLayer.append((newMatrix, line))
+        layer = nextLayer
+    return table
+
+
+# This method packs a walking distance matrix and the line of blank into an integer
+def packWalkingDistance(matrix, blankLine):
+    lines = len(matrix)
+    key = blankLine << (WALKING_DISTANCE_BITS * lines * lines)
+    for line in range(0, lines):
+        for goalLine in range(0, lines):
+            key |= matrix[line][goalLine] << (WALKING_DISTANCE_BITS * (lines * line + goalLine))
+    return key
+
+
+# This class holds the lookup tables of linear conflict and walking distance heuristics for one goal state
+class HeuristicTables:
+
+    # This method executes when HeuristicTables class is instantiated (a constructor method), builds the per (tile, index) weights
+    # and loads the line tables from disk (they are built and stored first if they do not exist)
+    def __init__(self, goalState, columns, directory):
+        size = len(goalState)
+        rows = size // columns
+        goalPositions = buildGoalPositions(goalState)
+
+        # manhattan distance of every tile at every index, manhattanDistances[tile][index]
+        self.manhattanDistances = []
+        # linear conflict key weights of every tile at every index for rows and columns
+        self.rowConflictWeights = []
+        self.columnConflictWeights = []
+        # walking distance key weights of every tile at every index for rows and columns
+        self.rowWalkingWeights = []
+        self.columnWalkingWeights = []
+
+        rowBase = columns + 1
+        columnBase = rows + 1
+        for tile in range(0, size):
+            goalRow = goalPositions[tile] // columns
+            goalColumn = goalPositions[tile] % columns
+            manhattanDistances = []
+            rowConflictWeights = []
+            columnConflictWeights = []
+            rowWalkingWeights = []
+            columnWalkingWeights = []
+            for index in range(0, size):
+                row = index // columns
+                column = index % columns
+                if(tile == 0):
+                    manhattanDistances.append(0)
+                    rowConflictWeights.append(0)
+                    columnConflictWeights.append(0)
+                    rowWalkingWeights.append(row << (WALKING_DISTANCE_BITS * rows * rows))
+                    columnWalkingWeights.append(column << (WALKING_DISTANCE_BITS * columns * columns))
+                    continue
+                manhattanDistances.append(abs(row - goalRow) + abs(column - goalColumn))
+                rowConflictWeights.append((goalColumn + 1) * rowBase ** column if(row == goalRow) else 0)
+                columnConflictWeights.append((goalRow + 1) * columnBase ** row if(column == goalColumn) else 0)
+                rowWalkingWeights.append(1 << (WALKING_DISTANCE_BITS * (rows * row + goalRow)))
+                columnWalkingWeights.append(1 << (WALKING_DISTANCE_BITS * (columns * column + goalColumn)))
+            self.manhattanDistances.append(manhattanDistances)
+            self.rowConflictWeights.append(rowConflictWeights)
+            self.columnConflictWeights.append(columnConflictWeights)
+            self.rowWalkingWeights.append(rowWalkingWeights)
+            self.columnWalkingWeights.append(columnWalkingWeights)
+
+        # indexes of the board in every row and every column
+        self.rowIndexes = [[row * columns + column for column in range(0, columns)] for row in range(0, rows)]
+        self.columnIndexes = [[row * columns + column for row in range(0, rows)] for column in range(0, columns)]
+
+        # matrices of the goal state for walking distance
+        goalRowMatrix = [[0] * rows for row in range(0, rows)]
+        goalColumnMatrix = [[0] * columns for column in range(0, columns)]
+        for tile in range(1, size):
+            goalRowMatrix[goalPositions[tile] // columns][goalPositions[tile] // columns] += 1
+            goalColumnMatrix[goalPositions[tile] % columns][goalPositions[tile] % columns] += 1
+
+        name = '_'.join(str(tile) for tile in goalState) + '-' + str(columns)
+        self.rowConflictTable = loadTable(os.path.join(directory, 'lc-rows-' + str(columns) + '.json'),
+            lambda: buildLinearConflictTable(columns))
+        self.columnConflictTable = loadTable(os.path.join(directory, 'lc-columns-' + str(rows) + '.json'),
+            lambda: buildLinearConflictTable(rows))
+        self.rowWalkingTable = loadTable(os.path.join(directory, 'wd-rows-' + name + '.json'),
+            lambda: buildWalkingDistanceTable(goalRowMatrix, goalPositions[0] // columns))
+        self.columnWalkingTable = loadTable(os.path.join(directory, 'wd-columns-' + name + '.json'),
+            lambda: buildWalkingDistanceTable(goalColumnMatrix, goalPositions[0] % columns))
+
+    # This method returns manhattan distance plus linear conflicts of all rows and columns
+    def getLinearConflict(self, state):
+        totalDistance = 0
+        for index in range(0, len(state)):
+            totalDistance += self.manhattanDistances[state[index]][index]
+        for indexes in self.rowIndexes:
+            key = 0
+            for index in indexes:
+                key += self.rowConflictWeights[state[index]][index]
+            totalDistance += self.rowConflictTable[key]
+        for indexes in self.columnIndexes:
+            key = 0
+            for index in indexes:
+                key += self.columnConflictWeights[state[index]][index]
+            totalDistance += self.columnConflictTable[key]
+        return totalDistance
+
+    # This method returns the walking distance, sum of vertical (rows) and horizontal (columns) walking distance
+    def getWalkingDistance(self, state):
+        rowKey = 0
+        columnKey = 0
+        for index in range(0, len(state)):
+            tile = state[index]
+            rowKey += self.rowWalkingWeights[tile][index]
+            columnKey += self.columnWalkingWeights[tile][index]
+        return self.rowWalkingTable[rowKey] + self.columnWalkingTable[columnKey]
+
+
+# This method loads a table from a json file, the table is built with "buildTable" and stored first if the file does not exist
+# Dictionaries are stored as list of [key, value] pairs
+def loadTable(path, buildTable):
+    if(not(os.path.exists(path))):
+        table = buildTable()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so a half written table is never loaded
+        with open(path + '.tmp', 'w') as f:
+            json.dump(list(table.items()) if(isinstance(table, dict)) else table, f)
+        os.replace(path + '.tmp', path)
+        return table
+    with open(path, 'r') as f:
+        table = json.load(f)
+    if(len(table) > 0 and isinstance(table[0], list)):
+        return {key: value for [key, value] in table}
+    return table
+
+
+# Loaded tables for every (goal state, columns)
+loadedTables = {}
+
+
+# This method returns the heuristic tables of a goal state, they are loaded (or built) only once
+def getHeuristicTables(goalState, columns, directory=None):
+    key = (tuple(goalState), columns)
+    if(key not in loadedTables):
+        loadedTables[key] = HeuristicTables(goalState, columns, TABLE_DIRECTORY if(directory is None) else directory)
+    return loadedTables[key]
+
+
+# This method returns manhattan distance plus 2 moves for every tile which has to leave its row or column to let other tiles pass
+def linearConflictHeuristic(state, goalState, gameSize):
+    return getHeuristicTables(goalState, gameSize).getLinearConflict(state)
+
+
+# This method returns the walking distance of the state, number of vertical and horizontal moves needed if tiles
+# were only distinguished by their goal row (or goal column)
+def walkingDistanceHeuristic(state, goalState, gameSize):
+    return getHeuristicTables(goalState, gameSize).getWalkingDistance(state)